@@ -0,0 +1,63 @@
+"""Compares cost of picking emoji and color per embed, seeded by item name.
+
+Usage: `python benchmarks/bench_embeds.py`. Before is previous implementation, which reseeded global `random`.
+"""
+
+import random
+import sys
+import timeit
+from pathlib import Path
+from typing import Optional
+
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+
+from discord import Color
+
+from embeds import _random_color
+from emojis import DrinkEmojis, FruitEmojis, random_drink_emoji, random_fruit_emoji
+
+NAMES = [f'Drink {i}' for i in range(1000)]
+REPEAT = 5
+
+
+def old_random_fruit_emoji(seed: Optional[str] = None) -> str:
+    random.seed(seed)
+    return random.choice(list(FruitEmojis))
+
+
+def old_random_drink_emoji(seed: Optional[str] = None) -> str:
+    random.seed(seed)
+    return random.choice(list(DrinkEmojis))
+
+
+def old_random_color(max_total: int = 400, seed: Optional[str] = None) -> Color:
+    random.seed(seed)
+    r = random.randint(0, 255)
+    g = random.randint(0, min(max_total - r, 255))
+    b = random.randint(0, min(max_total - r - g, 255))
+
+    return Color.from_rgb(*random.sample([r, g, b], 3))
+
+
+def old() -> None:
+    for name in NAMES:
+        old_random_drink_emoji(name)
+        old_random_fruit_emoji(name)
+        old_random_color(seed=name)
+
+
+def new() -> None:
+    for name in NAMES:
+        random_drink_emoji(name)
+        random_fruit_emoji(name)
+        _random_color(seed=name)
+
+
+def main() -> None:
+    for label, function in (('before', old), ('after', new)):
+        best = min(timeit.repeat(function, number=10, repeat=REPEAT)) / (10 * len(NAMES))
+        print(f'{label:>6}: {best * 1e6:.2f} us per embed')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,143 @@
+"""Measures event loop lag while commands log heavily, with previous synchronous file handler and queued pipeline.
+
+Usage: `python benchmarks/bench_logging.py`. Lag is how much `asyncio.sleep(0.001)` overshoots while load task logs
+records like `cog_logging_wrapper` does. Each case runs in own process, as logging setup is global.
+"""
+
+import argparse
+import asyncio
+import logging
+import logging.handlers
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Callable
+
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+
+from logs import setup_logging
+
+# `(name, records, records per 1 ms tick or 0 for saturating burst, stall)`.
+CASES = (
+    ('paced', 10000, 5, False),
+    ('paced, slow disk', 10000, 5, True),
+    ('burst', 50000, 0, False),
+)
+MODES = ('sync', 'queue', 'sampled')
+
+KWARGS = {'name': 'Margarita', 'ingredients': ['Tequila', 'Triple sec', 'Lime juice'] * 5, 'amount': 3}
+STALL_EVERY = 200
+STALL_SECONDS = 0.005
+
+logger = logging.getLogger('cogs.drinks')
+
+
+def stall_file_writes() -> None:
+    """Blocks every `STALL_EVERY`th file write for `STALL_SECONDS`, like flush or rotation on slow disk."""
+    emit = logging.handlers.RotatingFileHandler.emit
+    count = 0
+
+    def stalled_emit(self: logging.handlers.RotatingFileHandler, record: logging.LogRecord) -> None:
+        nonlocal count
+        count += 1
+        if count % STALL_EVERY == 0:
+            time.sleep(STALL_SECONDS)
+        emit(self, record)
+
+    logging.handlers.RotatingFileHandler.emit = stalled_emit
+
+
+def setup(mode: str, path: Path) -> tuple[Callable[[], None], Callable[[], str]]:
+    """Returns function that logs one record and function that stops logging and returns report."""
+    if mode == 'sync':
+        # Previous setup of `main.main`.
+        handler = logging.handlers.RotatingFileHandler(
+            filename=path, encoding='utf-8', maxBytes=5 * 1024 * 1024, backupCount=5
+        )
+        handler.setFormatter(
+            logging.Formatter('[{asctime}] [{levelname:<8}] {name}: {message}', '%Y-%m-%d %H:%M:%S', style='{')
+        )
+        logging.basicConfig(handlers=[handler], level=logging.INFO)
+
+        def log() -> None:
+            logger.info(f'user:1 used drink with {KWARGS}')
+
+        return log, lambda: ''
+
+    queue_handler, listener = setup_logging(path, sample_rates={'cogs.drinks': 0.1} if mode == 'sampled' else None)
+
+    def log() -> None:
+        logger.info('%s:%s used %s with %s', 'user', 1, 'drink', KWARGS)
+
+    def stop() -> str:
+        listener.stop()
+        return f', dropped {queue_handler.dropped}'
+
+    return log, stop
+
+
+async def monitor(lags: list[float], stop: asyncio.Event) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await asyncio.sleep(0.001)
+        lags.append(time.perf_counter() - start - 0.001)
+
+
+async def load(log: Callable[[], None], records: int, pace: int) -> None:
+    for i in range(records):
+        log()
+
+        if pace and i % pace == 0:
+            await asyncio.sleep(0.001)
+        elif not pace and i % 50 == 0:
+            await asyncio.sleep(0)
+
+
+async def run(mode: str, records: int, pace: int, path: Path) -> None:
+    log, stop_logging = setup(mode, path)
+
+    lags: list[float] = []
+    stop = asyncio.Event()
+    monitor_task = asyncio.create_task(monitor(lags, stop))
+
+    start = time.perf_counter()
+    await load(log, records, pace)
+    elapsed = time.perf_counter() - start
+
+    stop.set()
+    await monitor_task
+    report = stop_logging()
+
+    lags.sort()
+    p50 = lags[len(lags) // 2] * 1000
+    p99 = lags[int(len(lags) * 0.99)] * 1000
+    print(
+        f'{mode:>8}: load {elapsed * 1000:5.0f} ms, lag p50 {p50:5.2f} ms, p99 {p99:5.2f} ms, max {lags[-1] * 1000:5.2f} ms{report}'
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--case', type=int, help='Index of case to run in this process.')
+    parser.add_argument('--mode', choices=MODES)
+    args = parser.parse_args()
+
+    if args.case is not None:
+        _, records, pace, stall = CASES[args.case]
+        if stall:
+            stall_file_writes()
+
+        with tempfile.TemporaryDirectory() as directory:
+            asyncio.run(run(args.mode, records, pace, Path(directory) / 'bench.log'))
+        return
+
+    for index, (name, records, pace, _) in enumerate(CASES):
+        print(f'{name} ({records} records):')
+        for mode in MODES:
+            subprocess.run([sys.executable, __file__, '--case', str(index), '--mode', mode], check=True)
+
+
+if __name__ == '__main__':
+    main()
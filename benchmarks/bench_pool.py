@@ -0,0 +1,111 @@
+"""Measures latency of concurrent reads while write transaction is open, without and with reader connections.
+
+Usage: `python benchmarks/bench_pool.py`. Without readers, reads of other tasks share writer connection and wait
+behind statements of transaction.
+"""
+
+import asyncio
+import contextlib
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from sqlite3 import PARSE_DECLTYPES
+
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+
+import aiosqlite
+
+from database import Database
+from database.models import Ingredient, UserSetItemSignature
+from typedefs import ItemType
+
+PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'foreign_keys': 'ON'}
+INGREDIENTS = 500
+USERS = 200
+READ_TASKS = 8
+READ_INTERVAL = 0.002  # Seconds between reads of each task.
+WRITE_CHUNKS = 20
+CHUNK_ROWS = 10000
+
+
+async def seed(database: Database) -> None:
+    async with database:
+        await database.upsert_ingredients(
+            [Ingredient(i, f'Ingredient {i}', None, None, False) for i in range(1, INGREDIENTS + 1)]
+        )
+        for user in range(1, USERS + 1):
+            await database.create_user(user, f'user {user}')
+            await database.set_user_ingredients(
+                *(UserSetItemSignature(user, i, i % 7 + 1) for i in range(1, INGREDIENTS + 1, 5))
+            )
+
+
+class Rollback(Exception):
+    pass
+
+
+async def write(database: Database, stop: asyncio.Event) -> None:
+    # One long transaction of big statements like catalog import, each one occupies writer connection thread. It's
+    # rolled back, so every run starts with same data and catalog stays small.
+    try:
+        async with database:
+            for chunk in range(WRITE_CHUNKS):
+                start = INGREDIENTS + 1 + chunk * CHUNK_ROWS
+                await database.upsert_ingredients(
+                    Ingredient(id, f'Imported {id}', 'Description', None, False) for id in range(start, start + CHUNK_ROWS)
+                )
+            raise Rollback
+    except Rollback:
+        pass
+    finally:
+        stop.set()
+
+
+async def read(database: Database, user: int, stop: asyncio.Event, latencies: list[float]) -> None:
+    while not stop.is_set():
+        start = time.perf_counter()
+        await database.get_user_ingredients_page(user, 25)
+        await database.count_user_items(ItemType.INGREDIENT, user)
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(READ_INTERVAL)
+
+
+async def run(path: Path, readers: int) -> list[float]:
+    async with aiosqlite.connect(path, detect_types=PARSE_DECLTYPES) as connection, contextlib.AsyncExitStack() as stack:
+        reader_connections = [
+            await stack.enter_async_context(aiosqlite.connect(path, detect_types=PARSE_DECLTYPES)) for _ in range(readers)
+        ]
+        database = Database(connection, PRAGMAS, reader_connections)
+        await database.init()
+
+        stop = asyncio.Event()
+        latencies: list[float] = []
+        await asyncio.gather(
+            write(database, stop),
+            *(read(database, user, stop, latencies) for user in range(1, READ_TASKS + 1)),
+        )
+
+        return latencies
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'bench.sqlite'
+        async with aiosqlite.connect(path, detect_types=PARSE_DECLTYPES) as connection:
+            database = Database(connection, PRAGMAS)
+            await database.init()
+            await seed(database)
+
+        for readers in (0, 2, 4):
+            latencies = sorted(await run(path, readers))
+            p99 = latencies[int(len(latencies) * 0.99)]
+            print(
+                f'{readers} readers: {len(latencies)} reads, '
+                f'p50 {statistics.median(latencies) * 1000:.2f} ms, p99 {p99 * 1000:.2f} ms'
+            )
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
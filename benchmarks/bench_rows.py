@@ -0,0 +1,97 @@
+"""Compares fetching 10k inventory rows into models with previous `sqlite3.Row` and `**row` path and current one.
+
+Usage: `python benchmarks/bench_rows.py`. Both run same query on same database file, previous path also uses previous
+boolean converter that decoded bytes and parsed int.
+"""
+
+import asyncio
+import sqlite3
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from sqlite3 import PARSE_DECLTYPES
+from typing import Any, Awaitable, Callable
+
+sys.path.insert(0, str(Path(__file__).parents[1] / 'src'))
+
+import aiosqlite
+
+from database import Database
+from database.models import Drink, Glass, UserDrink, UserSetItemSignature
+from database.sqlite import convert_boolean
+
+PRAGMAS = {'journal_mode': 'WAL', 'synchronous': 'NORMAL', 'foreign_keys': 'ON'}
+ROWS = 10000
+REPEAT = 30
+USER = 1
+
+QUERY = """
+SELECT id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail, amount
+FROM drink_inventory
+JOIN drinks ON drink_inventory.drink_id = drinks.id
+WHERE user_id=? AND amount > 0;
+"""
+
+
+def old_convert_boolean(val: bytes) -> bool:
+    return bool(int(val.decode()))
+
+
+async def seed(database: Database) -> None:
+    async with database:
+        glass: Glass = await database.insert_glass('Highball glass')
+        await database.upsert_drinks(
+            Drink(id, f'Drink {id}', None, 'IBA', 'Cocktail', id % 2 == 0, glass.id, 'Mix.', 'http://a')
+            for id in range(1, ROWS + 1)
+        )
+        await database.create_user(USER, 'user')
+        await database.set_user_drinks(*(UserSetItemSignature(USER, id, id % 5 + 1) for id in range(1, ROWS + 1)))
+
+
+async def measure(fetch: Callable[[], Awaitable[list[Any]]]) -> float:
+    timings: list[float] = []
+    for _ in range(REPEAT):
+        start = time.perf_counter()
+        rows = await fetch()
+        timings.append(time.perf_counter() - start)
+        assert len(rows) == ROWS
+
+    return statistics.median(timings)
+
+
+async def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        path = Path(directory) / 'bench.sqlite'
+
+        async with aiosqlite.connect(path, detect_types=PARSE_DECLTYPES) as connection:
+            database = Database(connection, PRAGMAS)
+            await database.init()
+            await seed(database)
+
+            async def new() -> list[UserDrink]:
+                return await database._fetchall(UserDrink, QUERY, (USER,))
+
+            new_time = await measure(new)
+
+        async with aiosqlite.connect(path, detect_types=PARSE_DECLTYPES) as connection:
+            connection.row_factory = sqlite3.Row
+            sqlite3.register_converter('boolean', old_convert_boolean)
+
+            async def old() -> list[UserDrink]:
+                async with connection.execute(QUERY, (USER,)) as cursor:
+                    rows = await cursor.fetchall()
+                return [UserDrink(**i) for i in rows]
+
+            try:
+                old_time = await measure(old)
+            finally:
+                sqlite3.register_converter('boolean', convert_boolean)
+
+    print(f'before: {old_time * 1000:.1f} ms median for {ROWS} rows')
+    print(f' after: {new_time * 1000:.1f} ms median for {ROWS} rows ({old_time / new_time:.2f}x)')
+
+
+if __name__ == '__main__':
+    asyncio.run(main())
@@ -0,0 +1,74 @@
+import time
+from collections import OrderedDict
+from typing import Generic, Optional
+
+from typedefs import KT, VT
+
+# fmt: off
+__all__ = (
+    'LRUCache',
+)
+# fmt: on
+
+
+class LRUCache(Generic[KT, VT]):
+    """Least recently used cache with optional time to live of entries, counts hits and misses."""
+
+    def __init__(self, maxsize: int, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+
+        self.data: OrderedDict[KT, tuple[float, VT]] = OrderedDict()
+
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __contains__(self, key: KT) -> bool:
+        entry = self.data.get(key)
+        return entry is not None and not self._expired(entry[0])
+
+    @property
+    def hit_rate(self) -> float:
+        total = self.hits + self.misses
+        return self.hits / total if total else 0.0
+
+    def _expired(self, created: float) -> bool:
+        return self.ttl is not None and time.monotonic() - created > self.ttl
+
+    def get(self, key: KT) -> VT | None:
+        entry = self.data.get(key)
+
+        if entry is None or self._expired(entry[0]):
+            if entry is not None:
+                del self.data[key]
+            self.misses += 1
+            return None
+
+        self.data.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+
+    def peek(self, key: KT) -> VT | None:
+        """Returns value without counting hit or miss and without marking it as recently used."""
+        entry = self.data.get(key)
+        if entry is None or self._expired(entry[0]):
+            return None
+
+        return entry[1]
+
+    def set(self, key: KT, value: VT) -> None:
+        self.data[key] = (time.monotonic(), value)
+        self.data.move_to_end(key)
+
+        while len(self.data) > self.maxsize:
+            self.data.popitem(last=False)
+
+    def pop(self, key: KT) -> VT | None:
+        entry = self.data.pop(key, None)
+        return entry[1] if entry is not None else None
+
+    def clear(self) -> None:
+        self.data.clear()
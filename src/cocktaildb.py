@@ -0,0 +1,126 @@
+import json
+from typing import IO, Any, Iterator, NamedTuple
+
+# fmt: off
+__all__ = (
+    'DrinkRecord',
+    'IngredientRecord',
+    'iter_json_array',
+    'parse_drink',
+    'parse_ingredient',
+)
+# fmt: on
+
+CHUNK_SIZE = 64 * 1024
+MAX_DRINK_INGREDIENTS = 15  # TheCocktailDB has `strIngredient1` ... `strIngredient15` fields.
+
+
+class IngredientRecord(NamedTuple):
+    id: int
+    name: str
+    description: str | None
+    type: str | None
+    alcohol: bool
+
+
+class DrinkRecord(NamedTuple):
+    id: int
+    name: str
+    name_alternate: str | None
+    tags: str | None
+    category: str | None
+    alcoholic: bool
+    glass: str | None  # Name, glasses don't have IDs in TheCocktailDB.
+    instructions: str | None
+    thumbnail: str | None
+    ingredients: list[tuple[str, str | None]]  # `(name, measure)` pairs.
+
+
+def _text(value: Any) -> str | None:
+    """Returns stripped string, or None for empty values as TheCocktailDB uses both `null` and `""`."""
+    if value is None:
+        return None
+
+    value = str(value).strip()
+    return value or None
+
+
+def _name(data: dict[str, Any], key: str) -> str:
+    name = _text(data.get(key))
+    if name is None:
+        raise ValueError(f'Item without {key!r}: {data!r}')
+
+    return name
+
+
+def parse_ingredient(data: dict[str, Any]) -> IngredientRecord:
+    return IngredientRecord(
+        int(data['idIngredient']),
+        _name(data, 'strIngredient'),
+        _text(data.get('strDescription')),
+        _text(data.get('strType')),
+        (_text(data.get('strAlcohol')) or '').lower() == 'yes',
+    )
+
+
+def parse_drink(data: dict[str, Any]) -> DrinkRecord:
+    ingredients: list[tuple[str, str | None]] = []
+    for i in range(1, MAX_DRINK_INGREDIENTS + 1):
+        name = _text(data.get(f'strIngredient{i}'))
+        if name:
+            ingredients.append((name, _text(data.get(f'strMeasure{i}'))))
+
+    return DrinkRecord(
+        int(data['idDrink']),
+        _name(data, 'strDrink'),
+        _text(data.get('strDrinkAlternate')),
+        _text(data.get('strTags')),
+        _text(data.get('strCategory')),
+        (_text(data.get('strAlcoholic')) or '').lower() != 'non alcoholic',
+        _text(data.get('strGlass')),
+        _text(data.get('strInstructions')),
+        _text(data.get('strDrinkThumb')),
+        ingredients,
+    )
+
+
+def iter_json_array(file: IO[str], chunk_size: int = CHUNK_SIZE) -> Iterator[Any]:
+    """Yields items of first JSON array in `file`, like `drinks` in `{"drinks": [...]}`, one at a time.
+
+    File is read in chunks of `chunk_size` characters, so only current item has to fit into memory.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    in_array = False
+    error: json.JSONDecodeError | None = None
+
+    while True:
+        if not in_array:
+            start = buffer.find('[')
+            if start != -1:
+                buffer = buffer[start + 1 :]
+                in_array = True
+                continue
+            buffer = ''
+        else:
+            buffer = buffer.lstrip(', \t\r\n')
+            if buffer.startswith(']'):
+                return
+
+            if buffer:
+                try:
+                    item, end = decoder.raw_decode(buffer)
+                except json.JSONDecodeError as e:
+                    error = e  # Item isn't read whole yet.
+                else:
+                    buffer = buffer[end:]
+                    yield item
+                    continue
+
+        chunk = file.read(chunk_size)
+        if not chunk:
+            if in_array:
+                raise ValueError('JSON array isn\'t closed.') from error
+            return
+
+        buffer += chunk
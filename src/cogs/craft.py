@@ -8,14 +8,17 @@ from discord.ext import commands
 import config
 from database.models import UserGlass, UserIngredient, UserSetItemSignature
 from embeds import PaginationView, available_crafts_embed, drink_embed, search_result_embed
-from exceptions import MissingGlassError, MissingIngredientError, NotFoundError
-from utils import cog_logging_wrapper
+from exceptions import MissingGlassError, MissingIngredientError, NotEnoughItemsError, NotFoundError
+from typedefs import ItemType
+from utils import cog_logging_wrapper, item_choices, send_followup
 
 if TYPE_CHECKING:
     from main import CustomBot
 
 logger = logging.getLogger(__name__)
 
+NEAR_CRAFT_MAX_MISSING = 1
+
 
 class ConfirmCraftView(discord.ui.View):
     message: discord.Message
@@ -51,7 +54,7 @@ class ConfirmCraftView(discord.ui.View):
 
     async def on_error(self, interaction: discord.Interaction, error: Exception, item: discord.ui.Item[Any]):
         if not isinstance(error, (MissingGlassError, MissingIngredientError)):
-            logger.exception(f'{error.__class__.__name__}: {error}')
+            logger.exception('%s: %s', error.__class__.__name__, error)
         await interaction.followup.send(f'```{error.__class__.__qualname__}: {error}```', ephemeral=True)
 
 
@@ -68,12 +71,12 @@ class Craft(commands.Cog):
     @cog_logging_wrapper(logger=logger, skip_errors=(MissingGlassError, MissingIngredientError, NotFoundError))
     async def craft_drink(self, interaction: discord.Interaction, name: Optional[str]) -> None:
         if name is None:
-            items = await self.bot.database.get_available_crafts(interaction.user.id)
+            items = await self.bot.database.get_craft_candidates(interaction.user.id, NEAR_CRAFT_MAX_MISSING)
 
             embeds = available_crafts_embed(interaction.user, items)
 
             view = PaginationView(embeds, interaction.user, timeout=300)
-            message = await interaction.followup.send(embed=embeds[0], view=view, wait=True)
+            message = await send_followup(interaction, embed=embeds[0], view=view, wait=True)
             view.message = message
             return
 
@@ -84,7 +87,7 @@ class Craft(commands.Cog):
             msg = '`Found more than 1 drink with this name.`\n`Try using full name or ID.`'
             embeds = search_result_embed(drink, full=False)
             view = PaginationView(embeds, interaction.user, timeout=300)
-            message = await interaction.followup.send(msg, embed=embeds[0], view=view, wait=True)
+            message = await send_followup(interaction, msg, embed=embeds[0], view=view, wait=True)
             view.message = message
             return
 
@@ -118,26 +121,29 @@ class Craft(commands.Cog):
             return amount, glass_exists, ingredients_exist
 
         async def confirm_callback() -> float:
-            amount, glass_exists, ingredients_exist = await check()
+            user_id = interaction.user.id
+
+            async with self.bot.database.lock_users(user_id):
+                _, glass_exists, ingredients_exist = await check()
 
-            async with self.bot.database:
-                await self.bot.database.set_user_drinks(
-                    UserSetItemSignature(interaction.user.id, drink.id, amount=amount),
-                )
+                # Inventory can change between check and write, e.g. by trade, so items are taken only if user still
+                # has them and transaction is rolled back otherwise.
+                async with self.bot.database:
+                    try:
+                        await self.bot.database.take_user_items(ItemType.GLASS, user_id, {glass_exists.id: 1})
+                    except NotEnoughItemsError:
+                        raise MissingGlassError('You are missing glass to make this drink!')
 
-                await self.bot.database.set_user_glasses(
-                    UserSetItemSignature(interaction.user.id, glass_exists.id, amount=glass_exists.amount - 1),
-                )
+                    try:
+                        await self.bot.database.take_user_items(
+                            ItemType.INGREDIENT, user_id, {i.id: 1 for i in ingredients_exist.values()}
+                        )
+                    except NotEnoughItemsError as error:
+                        raise MissingIngredientError(f'\n{error.item_name}')
 
-                ingredient_set_items: list[UserSetItemSignature] = []
-                for ingredient in ingredients_exist.values():
-                    ingredient_amount = ingredient.amount - 1
-                    ingredient_set_items.append(
-                        UserSetItemSignature(interaction.user.id, ingredient.id, ingredient_amount),
-                    )
-                await self.bot.database.set_user_ingredients(*ingredient_set_items)
+                    amounts = await self.bot.database.add_user_drinks(UserSetItemSignature(user_id, drink.id, amount=1))
 
-            return amount
+            return amounts[drink.id]
 
         await check()
 
@@ -145,9 +151,18 @@ class Craft(commands.Cog):
         embed = drink_embed(drink, glass, ingredients)
 
         msg = '`Are you sure that you want to craft this drink?`'
-        message = await interaction.followup.send(msg, view=view, embed=embed, wait=True)
+        message = await send_followup(interaction, msg, view=view, embed=embed, wait=True)
         view.message = message
 
+    @craft_drink.autocomplete('name')
+    async def craft_drink_name_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        items = await self.bot.database.complete_item_name(ItemType.DRINK, current)
+        return item_choices(items)
+
 
 async def setup(bot: 'CustomBot'):
     await bot.add_cog(
@@ -7,7 +7,8 @@ from discord.ext import commands
 
 import config
 from embeds import PaginationView, drink_inventory_embed, glass_inventory_embed, ingredient_inventory_embed
-from utils import cog_logging_wrapper
+from typedefs import ItemType
+from utils import cog_logging_wrapper, send_followup
 
 if TYPE_CHECKING:
     from main import CustomBot
@@ -29,11 +30,16 @@ class Inventory(commands.GroupCog, group_name='inventory'):
     async def inventory_drinks(self, interaction: discord.Interaction, user: Optional[discord.User]) -> None:
         target = user or interaction.user
 
-        items = await self.bot.database.get_user_drinks(target.id)
-        embeds = drink_inventory_embed(target, list(items.values()))
+        total = await self.bot.database.count_user_items(ItemType.DRINK, target.id)
+        pages = drink_inventory_embed(
+            target,
+            total,
+            lambda limit, after, offset: self.bot.database.get_user_drinks_page(target.id, limit, after, offset),
+        )
+        embed = await pages.get(0)
 
-        view = PaginationView(embeds, interaction.user, timeout=300)
-        message = await interaction.followup.send(embed=embeds[0], view=view, wait=True)
+        view = PaginationView(pages, interaction.user, timeout=300)
+        message = await send_followup(interaction, embed=embed, view=view, wait=True)
         view.message = message
 
     @app_commands.describe(user='User to show inventory of, defaults to self.')
@@ -42,11 +48,16 @@ class Inventory(commands.GroupCog, group_name='inventory'):
     async def inventory_glasses(self, interaction: discord.Interaction, user: Optional[discord.User]) -> None:
         target = user or interaction.user
 
-        items = await self.bot.database.get_user_glasses(target.id)
-        embeds = glass_inventory_embed(target, list(items.values()))
+        total = await self.bot.database.count_user_items(ItemType.GLASS, target.id)
+        pages = glass_inventory_embed(
+            target,
+            total,
+            lambda limit, after, offset: self.bot.database.get_user_glasses_page(target.id, limit, after, offset),
+        )
+        embed = await pages.get(0)
 
-        view = PaginationView(embeds, interaction.user, timeout=300)
-        message = await interaction.followup.send(embed=embeds[0], view=view, wait=True)
+        view = PaginationView(pages, interaction.user, timeout=300)
+        message = await send_followup(interaction, embed=embed, view=view, wait=True)
         view.message = message
 
     @app_commands.describe(user='User to show inventory of, defaults to self.')
@@ -55,11 +66,16 @@ class Inventory(commands.GroupCog, group_name='inventory'):
     async def inventory_ingredients(self, interaction: discord.Interaction, user: Optional[discord.User]) -> None:
         target = user or interaction.user
 
-        items = await self.bot.database.get_user_ingredients(target.id)
-        embeds = ingredient_inventory_embed(target, list(items.values()))
+        total = await self.bot.database.count_user_items(ItemType.INGREDIENT, target.id)
+        pages = ingredient_inventory_embed(
+            target,
+            total,
+            lambda limit, after, offset: self.bot.database.get_user_ingredients_page(target.id, limit, after, offset),
+        )
+        embed = await pages.get(0)
 
-        view = PaginationView(embeds, interaction.user, timeout=300)
-        message = await interaction.followup.send(embed=embeds[0], view=view, wait=True)
+        view = PaginationView(pages, interaction.user, timeout=300)
+        message = await send_followup(interaction, embed=embed, view=view, wait=True)
         view.message = message
 
 
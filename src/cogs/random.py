@@ -8,7 +8,7 @@ from discord.ext import commands
 import config
 from embeds import drink_embed, ingredient_embed
 from exceptions import NotFoundError
-from utils import cog_logging_wrapper
+from utils import cog_logging_wrapper, send_followup
 
 if TYPE_CHECKING:
     from main import CustomBot
@@ -38,7 +38,7 @@ class Random(commands.GroupCog, group_name='random'):
 
             embed = drink_embed(data, glass, ingredients, full=full)
 
-            await interaction.followup.send(embed=embed)
+            await send_followup(interaction, embed=embed)
         else:
             raise NotFoundError(f'No drinks been found.')
 
@@ -49,7 +49,7 @@ class Random(commands.GroupCog, group_name='random'):
         data = await self.bot.database.get_random_ingredient()
         if data:
             embed = ingredient_embed(data, full=full)
-            await interaction.followup.send(embed=embed)
+            await send_followup(interaction, embed=embed)
         else:
             raise NotFoundError(f'No ingredients been found.')
 
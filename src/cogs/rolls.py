@@ -1,5 +1,6 @@
 import logging
 import random
+from collections import Counter
 from typing import TYPE_CHECKING
 
 import discord
@@ -8,9 +9,9 @@ from discord.ext import commands
 
 import config
 from database.models import Drink, Glass, Ingredient, UserSetItemSignature
-from embeds import drink_embed, glass_embed, ingredient_embed
+from embeds import PaginationView, drink_embed, glass_embed, ingredient_embed, roll_summary_embed
 from typedefs import ItemType
-from utils import cog_logging_wrapper
+from utils import cog_logging_wrapper, send_followup
 
 if TYPE_CHECKING:
     from main import CustomBot
@@ -20,15 +21,22 @@ logger = logging.getLogger(__name__)
 Data = Drink | Glass | Ingredient
 
 
-def get_random_type() -> ItemType:
-    percent = random.randint(0, 100)
+# Same odds as `randint(0, 100)` split into 11-100, 1-10 and 0.
+ROLL_WEIGHTS = {
+    ItemType.INGREDIENT: 90,
+    ItemType.GLASS: 10,
+    ItemType.DRINK: 1,
+}
+
+MAX_ROLL_COUNT = 100
+
 
-    if percent > 10:
-        return ItemType.INGREDIENT
-    elif percent > 0:
-        return ItemType.GLASS
-    else:
-        return ItemType.DRINK
+def get_random_types(k: int) -> list[ItemType]:
+    return random.choices(list(ROLL_WEIGHTS), weights=list(ROLL_WEIGHTS.values()), k=k)
+
+
+def get_random_type() -> ItemType:
+    return get_random_types(1)[0]
 
 
 class Rolls(commands.Cog):
@@ -56,33 +64,56 @@ class Rolls(commands.Cog):
 
         return embed
 
+    @app_commands.describe(count=f'Amount of rolls to make at once, up to {MAX_ROLL_COUNT}, defaults to 1.')
     @app_commands.command(name='roll', description='Roll for random ingredient, glass or drink.')
     @cog_logging_wrapper(logger=logger)
-    async def roll(self, interaction: discord.Interaction) -> None:
+    async def roll(
+        self,
+        interaction: discord.Interaction,
+        count: app_commands.Range[int, 1, MAX_ROLL_COUNT] = 1,
+    ) -> None:
+        if count > 1:
+            return await self.roll_many(interaction, count)
+
         type = get_random_type()
 
         data = await self.bot.database.get_random_item(type)
 
         async with self.bot.database:
             await self.bot.database.create_user(interaction.user.id, interaction.user.name)
+            amount = await self.bot.database.award_item(interaction.user.id, type, data.id)
 
-            current = await self.bot.database.get_user_items(type, interaction.user.id)
+        if isinstance(amount, float) and amount.is_integer():
+            amount = int(amount)
 
-            exists = current.get(data.id)
+        embed = await self.get_data_embed(data)
+        await send_followup(interaction, f'`You received {type}!`\n`Now you have {amount} in inventory.`', embed=embed)
 
-            if exists:
-                amount = exists.amount + 1
-            else:
-                amount = 1.0
+    async def roll_many(self, interaction: discord.Interaction, count: int) -> None:
+        types = Counter(get_random_types(count))
 
-            item = UserSetItemSignature(user_id=interaction.user.id, item_id=data.id, amount=amount)
-            await self.bot.database.set_user_items(type, item)
+        rolled: list[tuple[ItemType, Data, int, float]] = []
+        async with self.bot.database:
+            await self.bot.database.create_user(interaction.user.id, interaction.user.name)
 
-        if isinstance(amount, float) and amount.is_integer():
-            amount = int(amount)
+            for type in ItemType:
+                if not types[type]:
+                    continue
 
-        embed = await self.get_data_embed(data)
-        await interaction.followup.send(f'`You received {type}!`\n`Now you have {amount} in inventory.`', embed=embed)
+                items = await self.bot.database.get_random_items(type, types[type])
+                unique = {item.id: item for item in items}
+                counts = Counter(item.id for item in items)
+
+                amounts = await self.bot.database.add_user_items(
+                    type,
+                    *(UserSetItemSignature(interaction.user.id, id, amount) for id, amount in counts.items()),
+                )
+                rolled.extend((type, unique[id], amount, amounts[id]) for id, amount in counts.most_common())
+
+        embeds = roll_summary_embed(interaction.user, rolled)
+        view = PaginationView(embeds, interaction.user, timeout=300)
+        message = await send_followup(interaction, f'`You rolled {count} times!`', embed=embeds[0], view=view, wait=True)
+        view.message = message
 
 
 async def setup(bot: 'CustomBot'):
@@ -6,9 +6,10 @@ from discord import app_commands
 from discord.ext import commands
 
 import config
-from embeds import PaginationView, drink_embed, ingredient_embed, search_result_embed
+from embeds import PaginationView, drink_embed, drink_search_embed, ingredient_embed, search_result_embed
 from exceptions import ArgumentError, NotFoundError
-from utils import cog_logging_wrapper
+from typedefs import ItemType
+from utils import cog_logging_wrapper, item_choices, send_followup, split_last
 
 if TYPE_CHECKING:
     from main import CustomBot
@@ -72,10 +73,10 @@ class Search(commands.GroupCog, group_name='search'):
         else:
             glass_id = None
 
-        drinks = await self.bot.database.search_drinks(name, ingredients, glass_id)
+        total = await self.bot.database.count_search_drinks(name, ingredients, glass_id)
 
-        if len(drinks) == 1:
-            data = drinks[0]
+        if total == 1:
+            data = (await self.bot.database.search_drinks(name, ingredients, glass_id, limit=1))[0]
 
             glass = await self.bot.database.get_glass_by_id(data.glass)
 
@@ -85,14 +86,49 @@ class Search(commands.GroupCog, group_name='search'):
             ingredient_data = await self.bot.database.get_drink_ingredients(data.id)
             embed = drink_embed(data, glass, ingredient_data, full=full)
 
-            await interaction.followup.send(embed=embed)
+            await send_followup(interaction, embed=embed)
         else:
-            embeds = search_result_embed(drinks, full=full)
-            view = PaginationView(embeds, interaction.user, timeout=300)
-
-            message = await interaction.followup.send(embed=embeds[0], view=view, wait=True)
+            pages = drink_search_embed(
+                total,
+                lambda limit, after, offset: self.bot.database.search_drinks(
+                    name, ingredients, glass_id, limit=limit, after=after, offset=offset
+                ),
+                full=full,
+            )
+            embed = await pages.get(0)
+
+            view = PaginationView(pages, interaction.user, timeout=300)
+            message = await send_followup(interaction, embed=embed, view=view, wait=True)
             view.message = message
 
+    @search_drink.autocomplete('name')
+    async def search_drink_name_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        items = await self.bot.database.complete_item_name(ItemType.DRINK, current)
+        return item_choices(items, send_name=True)  # Name is searched with `LIKE`, not resolved as ID.
+
+    @search_drink.autocomplete('ingredient_name')
+    async def search_drink_ingredient_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        head, last = split_last(current)
+        items = await self.bot.database.complete_item_name(ItemType.INGREDIENT, last)
+        return item_choices(items, prefix=head)
+
+    @search_drink.autocomplete('glass_name')
+    async def search_drink_glass_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        items = await self.bot.database.complete_item_name(ItemType.GLASS, current)
+        return item_choices(items)
+
     @app_commands.describe(
         name='Name or ID of ingredient.',
         full='Display full info about ingredient, defaults to False.',
@@ -108,11 +144,20 @@ class Search(commands.GroupCog, group_name='search'):
         elif isinstance(data, list):
             embeds = search_result_embed(data, full=full)
             view = PaginationView(embeds, interaction.user, timeout=300)
-            message = await interaction.followup.send(embed=embeds[0], view=view, wait=True)
+            message = await send_followup(interaction, embed=embeds[0], view=view, wait=True)
             view.message = message
         else:
             embed = ingredient_embed(data, full=full)
-            await interaction.followup.send(embed=embed)
+            await send_followup(interaction, embed=embed)
+
+    @search_ingredient.autocomplete('name')
+    async def search_ingredient_name_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        items = await self.bot.database.complete_item_name(ItemType.INGREDIENT, current)
+        return item_choices(items)
 
 
 async def setup(bot: 'CustomBot'):
@@ -1,9 +1,7 @@
-import copy
 import logging
 import re
 from dataclasses import asdict
-from itertools import zip_longest
-from typing import TYPE_CHECKING, Any, Awaitable, Callable, Optional, Self
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Self
 
 import discord
 from discord import Member, User, app_commands
@@ -13,9 +11,9 @@ import config
 from database.models import Drink, Glass, Ingredient, UserDrink, UserGlass, UserIngredient, UserInventory
 from embeds import trade_offer_embed
 from emojis import Emojis
-from exceptions import ArgumentError, NotFoundError
+from exceptions import ArgumentError, NotEnoughItemsError, NotFoundError
 from typedefs import ItemType
-from utils import cog_logging_wrapper, reverse_dict
+from utils import cog_logging_wrapper, item_choices, reverse_dict, send_followup, split_last
 
 if TYPE_CHECKING:
     from main import CustomBot
@@ -26,6 +24,7 @@ logger = logging.getLogger(__name__)
 ParsedData = dict[ItemType, list[tuple[str, int]]]
 
 PARSE_REGEXP = re.compile(r'(?P<type>[A-Za-z]+)[: ]+(?P<name>[\w ]+)[:]*(?P<amount>\d+)*')
+PARTIAL_REGEXP = re.compile(r'(?P<type>[A-Za-z]+)(?P<separator>[: ]+)(?P<name>[\w ]*)$')
 
 VALID_TYPES = reverse_dict(
     {
@@ -111,7 +110,7 @@ class AcceptView(discord.ui.View):
 
     async def on_error(self, interaction: discord.Interaction, error: Exception, item: discord.ui.Item[Any]):
         if not isinstance(error, (ArgumentError)):
-            logger.exception(f'{error.__class__.__name__}: {error}')
+            logger.exception('%s: %s', error.__class__.__name__, error)
         await interaction.followup.send(f'```{error.__class__.__qualname__}: {error}```', ephemeral=True)
 
 
@@ -125,15 +124,14 @@ class Trade(commands.Cog):
 
     async def get_items(self, data: ParsedData) -> UserInventory:
         items = UserInventory({}, {}, {})
+        missing: list[str] = []
 
         for key, values in data.items():
-            for value in values:
-                item = await self.bot.database.get_item(key, value[0])
+            resolved = await self.bot.database.resolve_items(key, [value[0] for value in values])
 
+            for value, item in zip(values, resolved):
                 if item is None:
-                    raise NotFoundError(f'{key.title()} with name or ID {value[0]} was not found.')
-                elif isinstance(item, list):
-                    item = item[0]
+                    missing.append(f'{key.title()} with name or ID {value[0]} was not found.')
 
                 if isinstance(item, Drink):
                     items.drinks[item.id] = UserDrink(**asdict(item), amount=value[1])
@@ -142,6 +140,9 @@ class Trade(commands.Cog):
                 elif isinstance(item, Ingredient):
                     items.ingredients[item.id] = UserIngredient(**asdict(item), amount=value[1])
 
+        if missing:
+            raise NotFoundError('\n'.join(missing))
+
         return items
 
     def has_items(
@@ -157,42 +158,6 @@ class Trade(commands.Cog):
                 else:
                     raise ValueError(item.name)
 
-    def get_different_items(
-        self,
-        inventory: UserInventory,
-        *,
-        add: Optional[UserInventory] = None,
-        remove: Optional[UserInventory] = None,
-    ):
-        # This whole function smells really bad but I don't know how to do it dynamically better.
-        diff = UserInventory({}, {}, {})
-        # Assuming remove_items all present in items
-        for items, diff_items, add_items, remove_items in zip_longest(inventory, diff, add or (), remove or ()):
-            if add_items:
-                for id, item in add_items.items():
-                    if id in diff_items:
-                        item_copy = diff_items[id]
-                    elif id in items:
-                        item_copy = copy.copy(items[id])
-                    else:
-                        item_copy = copy.copy(item)
-                        item_copy.amount = 0
-
-                    item_copy.amount += item.amount  # pyright: ignore[reportAttributeAccessIssue] It'll be always same type.
-                    diff_items[id] = item_copy  # pyright: ignore[reportArgumentType] It'll be always same type.
-
-            if remove_items:
-                for id, item in remove_items.items():
-                    if id in diff_items:
-                        item_copy = diff_items[id]
-                    else:
-                        item_copy = copy.copy(items[id])
-
-                    item_copy.amount -= item.amount  # pyright: ignore[reportAttributeAccessIssue] It'll be always same type.
-                    diff_items[id] = item_copy  # pyright: ignore[reportArgumentType] It'll be always same type.
-
-        return diff
-
     @app_commands.describe(
         target='User to trade with.',
         offer_string='Items to offer other user, should be in format of {type}:{name or id}[:amount] example: d:12345:10, glass:12',
@@ -232,21 +197,30 @@ class Trade(commands.Cog):
             return user_inventory, target_inventory
 
         async def transfer() -> None:
-            user_inventory, target_inventory = await check()
-
-            user_diff = self.get_different_items(user_inventory, add=request, remove=offer)
-            target_diff = self.get_different_items(target_inventory, add=offer, remove=request)
-
-            async with self.bot.database:
-                await self.bot.database.set_user_inventory(interaction.user.id, user_diff)
-                await self.bot.database.set_user_inventory(target.id, target_diff)
+            try:
+                async with self.bot.database:
+                    await self.bot.database.create_user(interaction.user.id, interaction.user.name)
+                    await self.bot.database.create_user(target.id, target.name)
+
+                    for type, offer_items, request_items in zip(ItemType, offer, request):
+                        await self.bot.database.move_user_items(
+                            type, interaction.user.id, target.id, {id: item.amount for id, item in offer_items.items()}
+                        )
+                        await self.bot.database.move_user_items(
+                            type, target.id, interaction.user.id, {id: item.amount for id, item in request_items.items()}
+                        )
+            except NotEnoughItemsError as error:
+                if error.user_id == interaction.user.id:
+                    raise ArgumentError(f'You don\'t have enough of {error.item_name} to trade.')
+                raise ArgumentError(f'Target doesn\'t have enough of {error.item_name} to trade.')
 
         await check()
 
         embed = trade_offer_embed(interaction.user, offer=offer, request=request)
         view = AcceptView(user=interaction.user, target=target, callback=transfer, embed=embed, timeout=300)
 
-        message = await interaction.followup.send(
+        message = await send_followup(
+            interaction,
             f'Hey, <@{target.id}>\nYou received trade offer from `{interaction.user.display_name}`',
             embed=embed,
             view=view,
@@ -254,6 +228,36 @@ class Trade(commands.Cog):
         )
         view.message = message
 
+    async def items_autocomplete(self, current: str) -> list[app_commands.Choice[str]]:
+        head, last = split_last(current)
+
+        match = PARTIAL_REGEXP.match(last)
+        if match is None:
+            return []
+
+        type = match['type']
+        if type not in VALID_TYPES:
+            return []
+
+        items = await self.bot.database.complete_item_name(VALID_TYPES[type], match['name'])
+        return item_choices(items, prefix=f'{head}{type}{match["separator"]}')
+
+    @trade.autocomplete('offer_string')
+    async def trade_offer_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        return await self.items_autocomplete(current)
+
+    @trade.autocomplete('request_string')
+    async def trade_request_autocomplete(
+        self,
+        interaction: discord.Interaction,
+        current: str,
+    ) -> list[app_commands.Choice[str]]:
+        return await self.items_autocomplete(current)
+
 
 async def setup(bot: 'CustomBot'):
     await bot.add_cog(
@@ -1,8 +1,16 @@
+import asyncio
 import logging
-from typing import TYPE_CHECKING
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Literal
 
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
+
+import config
+from metrics import metrics
+from sync import CatalogSync
+from typedefs import ItemType
 
 if TYPE_CHECKING:
     from main import CustomBot
@@ -13,6 +21,29 @@ logger = logging.getLogger(__name__)
 class Utils(commands.Cog):
     def __init__(self, bot: 'CustomBot'):
         self.bot: 'CustomBot' = bot
+        self.write_metrics.change_interval(seconds=config.METRICS_INTERVAL)
+
+    async def cog_load(self) -> None:
+        if config.METRICS_PATH:
+            self.write_metrics.start(Path(config.METRICS_PATH))
+
+    async def cog_unload(self) -> None:
+        self.write_metrics.cancel()
+
+    @tasks.loop(seconds=60)
+    async def write_metrics(self, path: Path) -> None:
+        """Rewrites Prometheus text file for node exporter textfile collector or other scraper."""
+
+        def write(text: str) -> None:
+            # Written to temporary file first, so scraper never reads partial file.
+            temporary = path.with_suffix('.tmp')
+            temporary.write_text(text, encoding='utf-8')
+            temporary.replace(path)
+
+        try:
+            await asyncio.to_thread(write, metrics.prometheus())
+        except OSError as error:
+            logger.warning('Failed to write metrics to %s: %s', path, error)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -35,9 +66,59 @@ class Utils(commands.Cog):
     @commands.command()
     @commands.is_owner()
     async def logs(self, ctx: commands.Context['CustomBot']) -> None:
-        log = discord.File("discord.log")
+        log = discord.File(config.LOG_PATH)
         await ctx.send(file=log)
 
+    @commands.command()
+    @commands.is_owner()
+    async def stats(self, ctx: commands.Context['CustomBot']) -> None:
+        """Sends latencies of slowest commands and queries since start."""
+        summary = metrics.summary()
+        if len(summary) > 1990:
+            summary = summary[:1987] + '...'
+
+        await ctx.send(f'```{summary}```')
+
+    @commands.command()
+    @commands.is_owner()
+    async def slowqueries(self, ctx: commands.Context['CustomBot'], limit: int = 5) -> None:
+        """Sends slowest database queries since start with their parameter types and query plans."""
+        text = metrics.slowest(limit)
+        if len(text) > 1990:
+            text = text[:1987] + '...'
+
+        await ctx.send(f'```{text}```')
+
+    @commands.command()
+    @commands.is_owner()
+    async def catalogsync(
+        self,
+        ctx: commands.Context['CustomBot'],
+        type: Literal['all', 'drinks', 'ingredients'] = 'all',
+    ) -> None:
+        """Updates drinks and ingredients in catalog from TheCocktailDB, unchanged ones are skipped."""
+        types = {
+            'all': (ItemType.INGREDIENT, ItemType.DRINK),
+            'drinks': (ItemType.DRINK,),
+            'ingredients': (ItemType.INGREDIENT,),
+        }[type]
+
+        sync = CatalogSync(
+            ctx.bot.web_session,
+            ctx.bot.database,
+            config.COCKTAILDB_URL,
+            config.SYNC_CACHE_PATH,
+            workers=config.SYNC_WORKERS,
+            rate=config.SYNC_RATE,
+        )
+
+        start = time.perf_counter()
+        async with ctx.typing():
+            stats = await sync.sync_catalog(types)
+
+        summary = ', '.join(f'{key}: {value}' for key, value in sorted(stats.items()))
+        await ctx.send(f'Catalog synced in {time.perf_counter() - start:.1f}s. {summary}')
+
 
 async def setup(bot: 'CustomBot'):
     await bot.add_cog(Utils(bot))
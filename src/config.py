@@ -1,9 +1,43 @@
 import os
 from pathlib import Path
 
+from logs import parse_sample_rates
+
 TOKEN: str = os.getenv('BOT_TOKEN', '')
 SERVER: int | None = int(os.getenv('SERVER', '0')) or None
 DB_PATH: Path = Path(__file__).parent / 'database.sqlite'
+DB_READERS: int = int(os.getenv('DB_READERS', '2'))  # Read-only connections used alongside writer one.
+
+# Applied to every database connection on open, see https://www.sqlite.org/pragma.html
+SQLITE_PRAGMAS: dict[str, str] = {
+    'journal_mode': os.getenv('SQLITE_JOURNAL_MODE', 'WAL'),
+    'synchronous': os.getenv('SQLITE_SYNCHRONOUS', 'NORMAL'),
+    'mmap_size': os.getenv('SQLITE_MMAP_SIZE', str(256 * 1024 * 1024)),
+    'cache_size': os.getenv('SQLITE_CACHE_SIZE', str(-64 * 1024)),  # Negative value is size in KiB.
+    'temp_store': os.getenv('SQLITE_TEMP_STORE', 'MEMORY'),
+    'foreign_keys': os.getenv('SQLITE_FOREIGN_KEYS', 'ON'),
+}
+
+# Catalog sync with TheCocktailDB API, URL can point to local server for testing.
+COCKTAILDB_URL: str = os.getenv('COCKTAILDB_URL', 'https://www.thecocktaildb.com/api/json/v1/1/')
+SYNC_WORKERS: int = int(os.getenv('SYNC_WORKERS', '4'))
+SYNC_RATE: float = float(os.getenv('SYNC_RATE', '10'))  # Requests per second.
+SYNC_CONNECTIONS_PER_HOST: int = int(os.getenv('SYNC_CONNECTIONS_PER_HOST', '4'))
+SYNC_CACHE_PATH: Path = Path(__file__).parent / 'sync_cache'
+
+# Prometheus text file with command and query metrics, rewritten every `METRICS_INTERVAL` seconds, empty disables it.
+METRICS_PATH: str = os.getenv('METRICS_PATH', str(Path(__file__).parent / 'metrics.prom'))
+METRICS_INTERVAL: float = float(os.getenv('METRICS_INTERVAL', '60'))
+
+# Database reads slower than this are logged with `EXPLAIN QUERY PLAN`, sampled after first one of each query, 0 disables.
+SLOW_QUERY_MS: float = float(os.getenv('SLOW_QUERY_MS', '100'))
+SLOW_QUERY_SAMPLE: float = float(os.getenv('SLOW_QUERY_SAMPLE', '0.1'))
+
+# Log records are queued and written as JSON lines by separate thread, records over `LOG_QUEUE_SIZE` are dropped.
+LOG_PATH: Path = Path(os.getenv('LOG_PATH', 'discord.log'))
+LOG_QUEUE_SIZE: int = int(os.getenv('LOG_QUEUE_SIZE', '10000'))
+# Fractions of info records kept by logger, like `cogs.drinks=0.1,cogs.inventory=0.5`, warnings are always kept.
+LOG_SAMPLE_RATES: dict[str, float] = parse_sample_rates(os.getenv('LOG_SAMPLE_RATES', ''))
 
 if not TOKEN:
     raise ValueError('`BOT_TOKEN` environment variable is not set.')
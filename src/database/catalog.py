@@ -0,0 +1,136 @@
+import asyncio
+from dataclasses import asdict
+from typing import Callable, Container, Iterable, Mapping
+
+from typedefs import ItemType
+
+from .index import NameIndex
+from .models import CraftCandidate, Drink, DrinkIngredient, Glass, Ingredient
+from .selector import RandomSelector
+
+# fmt: off
+__all__ = (
+    'Catalog',
+)
+# fmt: on
+
+
+class Catalog:
+    """In-memory copy of `drinks`, `glasses`, `ingredients` and `drink_ingredients` tables.
+
+    Catalog is read-only at runtime, so it's loaded once and rebuilt only after it was invalidated by insert.
+    Returned items are shared between callers and shouldn't be modified.
+    """
+
+    def __init__(self) -> None:
+        self.drinks: dict[int, Drink] = {}
+        self.glasses: dict[int, Glass] = {}
+        self.ingredients: dict[int, Ingredient] = {}
+        self.drink_ingredients: dict[int, list[DrinkIngredient]] = {}
+
+        # Each ingredient gets own bit, drink mask has bits of all ingredients it requires.
+        self.ingredient_bits: dict[int, int] = {}
+        self.drink_masks: dict[int, int] = {}
+
+        self.random: dict[ItemType, RandomSelector[int]] = {type: RandomSelector() for type in ItemType}
+        self.weights: dict[ItemType, dict[int, float]] = {type: {} for type in ItemType}
+        self.names: dict[ItemType, NameIndex] = {type: NameIndex() for type in ItemType}
+
+        self.loaded = False
+        self.lock = asyncio.Lock()
+
+        # Called on invalidation, used to drop caches of data derived from catalog.
+        self.listeners: list[Callable[[], None]] = []
+
+    def invalidate(self) -> None:
+        self.loaded = False
+
+        for listener in self.listeners:
+            listener()
+
+    def items(self, type: ItemType) -> dict[int, Drink] | dict[int, Glass] | dict[int, Ingredient]:
+        if type == ItemType.INGREDIENT:
+            return self.ingredients
+        elif type == ItemType.GLASS:
+            return self.glasses
+        elif type == ItemType.DRINK:
+            return self.drinks
+
+    def complete(self, type: ItemType, query: str, limit: int) -> list[int]:
+        """Returns up to `limit` IDs of items which names start with `query`, followed by ones containing it."""
+        index = self.names[type]
+
+        ids = index.prefix(query, limit)
+        if len(ids) < limit:
+            found = set(ids)
+            ids.extend(id for id in index.search(query) if id not in found)
+
+        return ids[:limit]
+
+    def ingredient_mask(self, ids: Iterable[int]) -> int:
+        mask = 0
+        for id in ids:
+            mask |= self.ingredient_bits.get(id, 0)
+
+        return mask
+
+    def craft_candidates(
+        self,
+        ingredients: Iterable[int],
+        glasses: Container[int],
+        max_missing: int = 0,
+    ) -> list[CraftCandidate]:
+        """Returns drinks that miss at most `max_missing` of owned `ingredients`, sorted by missing count and name."""
+        missing_mask = ~self.ingredient_mask(ingredients)
+
+        candidates: list[CraftCandidate] = []
+        for drink_id, mask in self.drink_masks.items():
+            missing = (mask & missing_mask).bit_count()
+            if missing > max_missing:
+                continue
+
+            drink = self.drinks[drink_id]
+            candidates.append(CraftCandidate(drink, missing, drink.glass in glasses))
+
+        candidates.sort(key=lambda i: (i.missing_ingredients, i.drink.name.lower()))
+        return candidates
+
+    def set_weights(self, type: ItemType, weights: Mapping[int, float]) -> None:
+        """Sets random selection weights of items by ID, items without weight default to `1.0`."""
+        self.weights[type] = dict(weights)
+        self.random[type] = RandomSelector(self.items(type), self.weights[type])
+
+    def build(
+        self,
+        drinks: Iterable[Drink],
+        glasses: Iterable[Glass],
+        ingredients: Iterable[Ingredient],
+        drink_ingredients: Iterable[tuple[int, int, str | None]],
+    ) -> None:
+        """Replaces catalog content, `drink_ingredients` are `(drink_id, ingredient_id, measure)` rows."""
+        self.drinks = {item.id: item for item in drinks}
+        self.glasses = {item.id: item for item in glasses}
+        self.ingredients = {item.id: item for item in ingredients}
+
+        self.drink_ingredients = {}
+        for drink_id, ingredient_id, measure in drink_ingredients:
+            ingredient = self.ingredients.get(ingredient_id)
+            if ingredient is None:
+                continue
+
+            item = DrinkIngredient(**asdict(ingredient), measure=measure)
+            self.drink_ingredients.setdefault(drink_id, []).append(item)
+
+        self.ingredient_bits = {id: 1 << i for i, id in enumerate(self.ingredients)}
+        self.drink_masks = {
+            drink_id: self.ingredient_mask(item.id for item in items)
+            for drink_id, items in self.drink_ingredients.items()
+            if drink_id in self.drinks
+        }
+
+        for type in ItemType:
+            items = self.items(type)
+            self.random[type] = RandomSelector(items, self.weights[type])
+            self.names[type] = NameIndex((item.id, item.name) for item in items.values())
+
+        self.loaded = True
@@ -0,0 +1,77 @@
+import bisect
+from typing import Iterable, Optional
+
+# fmt: off
+__all__ = (
+    'NameIndex',
+)
+# fmt: on
+
+NGRAM_SIZE = 3
+
+
+def _ngrams(string: str) -> set[str]:
+    return {string[i : i + NGRAM_SIZE] for i in range(len(string) - NGRAM_SIZE + 1)}
+
+
+class NameIndex:
+    """Case-insensitive trigram index over item names.
+
+    `search` matches same names as `name LIKE '%query%'` and keeps order in which items were added,
+    `prefix` returns names starting with query in alphabetical order.
+    """
+
+    def __init__(self, items: Iterable[tuple[int, str]] = ()) -> None:
+        self.ids: list[int] = []
+        self.names: list[str] = []
+        self.ngrams: dict[str, list[int]] = {}
+
+        for id, name in items:
+            self._add(id, name)
+
+        self.sorted_names = sorted((name, position) for position, name in enumerate(self.names))
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _add(self, id: int, name: str) -> None:
+        position = len(self.ids)
+        name = name.lower()
+
+        self.ids.append(id)
+        self.names.append(name)
+
+        for ngram in _ngrams(name):
+            self.ngrams.setdefault(ngram, []).append(position)
+
+    def search(self, query: str) -> list[int]:
+        """Returns IDs of items which names contain `query`."""
+        query = query.lower()
+
+        if len(query) < NGRAM_SIZE:
+            return [self.ids[i] for i, name in enumerate(self.names) if query in name]
+
+        postings: list[list[int]] = []
+        for ngram in _ngrams(query):
+            positions = self.ngrams.get(ngram)
+            if positions is None:
+                return []
+            postings.append(positions)
+
+        postings.sort(key=len)
+        candidates = set(postings[0]).intersection(*postings[1:])
+
+        return [self.ids[i] for i in sorted(candidates) if query in self.names[i]]
+
+    def prefix(self, query: str, limit: Optional[int] = None) -> list[int]:
+        """Returns IDs of items which names start with `query` sorted by name."""
+        query = query.lower()
+
+        out: list[int] = []
+        for i in range(bisect.bisect_left(self.sorted_names, (query, -1)), len(self.sorted_names)):
+            name, position = self.sorted_names[i]
+            if not name.startswith(query) or (limit is not None and len(out) >= limit):
+                break
+            out.append(self.ids[position])
+
+        return out
@@ -67,3 +67,26 @@ CREATE TABLE IF NOT EXISTS "glasses" (
 );
 COMMIT;
 """
+
+# Migration at index `i` upgrades schema to version `i + 1`, current version is stored in `PRAGMA user_version`.
+MIGRATIONS: tuple[str, ...] = (
+    """
+    DELETE FROM "drink_ingredients" WHERE rowid NOT IN (
+        SELECT MIN(rowid) FROM "drink_ingredients" GROUP BY "drink_id", "ingredient_id"
+    );
+    CREATE UNIQUE INDEX IF NOT EXISTS "drink_ingredients_drink_ingredient" ON "drink_ingredients" ("drink_id", "ingredient_id");
+    CREATE INDEX IF NOT EXISTS "drink_ingredients_ingredient" ON "drink_ingredients" ("ingredient_id", "drink_id");
+    CREATE INDEX IF NOT EXISTS "drinks_glass" ON "drinks" ("glass");
+    CREATE INDEX IF NOT EXISTS "drinks_name" ON "drinks" ("name");
+    CREATE INDEX IF NOT EXISTS "drink_inventory_user_amount" ON "drink_inventory" ("user_id", "amount", "drink_id");
+    CREATE INDEX IF NOT EXISTS "glass_inventory_user_amount" ON "glass_inventory" ("user_id", "amount", "glass_id");
+    CREATE INDEX IF NOT EXISTS "ingredient_inventory_user_amount" ON "ingredient_inventory" ("user_id", "amount", "ingredient_id");
+    """,
+)
+
+# Non unique catalog indexes made by migrations, bulk imports drop them and create them again after all rows are written.
+DEFERRABLE_INDEXES: dict[str, str] = {
+    'drink_ingredients_ingredient': 'CREATE INDEX IF NOT EXISTS "drink_ingredients_ingredient" ON "drink_ingredients" ("ingredient_id", "drink_id");',
+    'drinks_glass': 'CREATE INDEX IF NOT EXISTS "drinks_glass" ON "drinks" ("glass");',
+    'drinks_name': 'CREATE INDEX IF NOT EXISTS "drinks_name" ON "drinks" ("name");',
+}
@@ -0,0 +1,49 @@
+import asyncio
+from contextlib import AsyncExitStack, asynccontextmanager
+from typing import AsyncIterator
+
+# fmt: off
+__all__ = (
+    'KeyedLock',
+)
+# fmt: on
+
+
+class _Entry:
+    __slots__ = ('lock', 'users')
+
+    def __init__(self) -> None:
+        self.lock = asyncio.Lock()
+        self.users = 0
+
+
+class KeyedLock:
+    """Registry of `asyncio.Lock` by integer key, lock is removed when nobody holds or waits for it."""
+
+    def __init__(self) -> None:
+        self.entries: dict[int, _Entry] = {}
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    @asynccontextmanager
+    async def __call__(self, *keys: int) -> AsyncIterator[None]:
+        """Holds locks of all `keys`, they're acquired in sorted order so two callers can't deadlock."""
+        keys = tuple(sorted(set(keys)))
+
+        entries: list[_Entry] = []
+        for key in keys:
+            entry = self.entries.setdefault(key, _Entry())
+            entry.users += 1
+            entries.append(entry)
+
+        try:
+            async with AsyncExitStack() as stack:
+                for entry in entries:
+                    await stack.enter_async_context(entry.lock)
+                yield
+        finally:
+            for key, entry in zip(keys, entries):
+                entry.users -= 1
+                if not entry.users:
+                    del self.entries[key]
@@ -1,34 +1,211 @@
-from typing import Any, Iterable, Optional, TypeVar
+import dataclasses
+import functools
+import logging
+import operator
+import random
+import sqlite3
+import time
+from contextvars import ContextVar
+from typing import Any, Callable, Iterable, Iterator, Optional, TypeVar, cast
 
 import aiosqlite
 
+from metrics import metrics
+
+from ..catalog import Catalog
+from ..models import Drink, Glass, Ingredient
+
 ContainerT = TypeVar('ContainerT', bound=object)
 
+logger = logging.getLogger(__name__)
+
+# Set while current task is inside `async with database:` transaction, so reads can see its uncommitted changes.
+in_transaction: ContextVar[bool] = ContextVar('in_transaction', default=False)
+
+
+@functools.lru_cache(maxsize=512)
+def _row_builder(container: type[ContainerT], query: str, columns: tuple[str, ...]) -> Callable[[Any], ContainerT]:
+    """Returns function that makes `container` from plain tuple row of `query` with positional arguments.
+
+    Columns are matched to dataclass fields once per query, rows are only reordered if their order differs.
+    """
+    fields = tuple(i.name for i in dataclasses.fields(cast(Any, container)))
+    if columns == fields:
+        return lambda row: container(*row)
+
+    if sorted(columns) != sorted(fields):
+        raise TypeError(f'Columns {columns} of query don\'t match fields of {container.__name__}.')
+
+    getter = operator.itemgetter(*(columns.index(i) for i in fields))
+    return lambda row: container(*getter(row))
+
+
+def _columns(cursor: aiosqlite.Cursor) -> tuple[str, ...]:
+    return tuple(i[0] for i in cursor.description or ())
+
+
+def _plan_lines(rows: Iterable[Any]) -> list[str]:
+    """Returns `detail` of `EXPLAIN QUERY PLAN` rows `(id, parent, notused, detail)` indented by their depth."""
+    depths: dict[int, int] = {0: -1}
+    lines: list[str] = []
+    for id, parent, _, detail in rows:
+        depths[id] = depths.get(parent, -1) + 1
+        lines.append('  ' * depths[id] + detail)
+
+    return lines
+
 
 class Mixin:
     connection: aiosqlite.Connection
+    readers: list[aiosqlite.Connection]
+    readers_cycle: Iterator[aiosqlite.Connection]
+    catalog: Catalog
+    # Set by catalog writes, so rollback reloads catalog only if transaction could have changed it.
+    catalog_dirty: bool
+
+    # Reads that take at least `slow_query_threshold` seconds are recorded in `metrics.slow_queries`, `slow_query_sample`
+    # of them are also logged with their query plan. First slow execution of each query shape is always logged.
+    slow_query_threshold: Optional[float] = None
+    slow_query_sample: float = 1.0
+
+    def _reader(self) -> aiosqlite.Connection:
+        """Returns connection for read, writer one is used inside transaction or if there are no readers."""
+        if not self.readers or in_transaction.get():
+            return self.connection
+
+        return next(self.readers_cycle)
+
+    async def _fetch(
+        self,
+        query: str,
+        params: Optional[Iterable[Any]],
+        connection: Optional[aiosqlite.Connection],
+    ) -> tuple[list[Any], tuple[str, ...]]:
+        """Returns rows and column names of `query`, its duration and row count are recorded in `metrics`."""
+        connection = connection or self._reader()
+        start = time.perf_counter()
+
+        async with connection.execute(query, params) as cursor:
+            rows = list(await cursor.fetchall())
+            columns = _columns(cursor)
+
+        elapsed = time.perf_counter() - start
+        metrics.observe_query(query, elapsed, len(rows))
+
+        if self.slow_query_threshold is not None and elapsed >= self.slow_query_threshold:
+            await self._slow_query(query, params, elapsed, connection)
+
+        return rows, columns
+
+    async def _slow_query(
+        self,
+        query: str,
+        params: Optional[Iterable[Any]],
+        elapsed: float,
+        connection: aiosqlite.Connection,
+    ) -> None:
+        slow = metrics.observe_slow_query(query, elapsed, params)
+        if slow.count > 1 and random.random() >= self.slow_query_sample:
+            return
+
+        # Explained on same connection, so plan sees same schema and uncommitted tables of transaction.
+        try:
+            async with connection.execute(f'EXPLAIN QUERY PLAN {query}', params) as cursor:
+                slow.plan = _plan_lines(await cursor.fetchall())
+        except sqlite3.Error as error:
+            slow.plan = [f'{error.__class__.__name__}: {error}']
+
+        plan = '\n'.join(slow.plan)
+        logger.warning('Slow query took %.1f ms: %s params=%s\n%s', elapsed * 1000, slow.query, slow.params, plan)
 
     async def _fetchone(
         self,
         container: type[ContainerT],
         query: str,
         params: Optional[Iterable[Any]] = None,
+        *,
+        connection: Optional[aiosqlite.Connection] = None,
     ) -> ContainerT | None:
-        async with self.connection.execute(query, params) as cursor:
-            row = await cursor.fetchone()
+        rows, columns = await self._fetch(query, params, connection)
+        if not rows:
+            return None
 
-        if row is not None:
-            row = container(**row)
-
-        return row
+        return _row_builder(container, query, columns)(rows[0])
 
     async def _fetchall(
         self,
         container: type[ContainerT],
         query: str,
         params: Optional[Iterable[Any]] = None,
+        *,
+        connection: Optional[aiosqlite.Connection] = None,
     ) -> list[ContainerT]:
-        async with self.connection.execute(query, params) as cursor:
-            row = await cursor.fetchall()
+        rows, columns = await self._fetch(query, params, connection)
+        build = _row_builder(container, query, columns)
+
+        return [build(i) for i in rows]
+
+    async def _fetchcolumn(
+        self,
+        query: str,
+        params: Optional[Iterable[Any]] = None,
+        *,
+        connection: Optional[aiosqlite.Connection] = None,
+    ) -> list[Any]:
+        """Returns values of first column."""
+        rows, _ = await self._fetch(query, params, connection)
+        return [row[0] for row in rows]
+
+    async def _fetchrows(
+        self,
+        query: str,
+        params: Optional[Iterable[Any]] = None,
+        *,
+        connection: Optional[aiosqlite.Connection] = None,
+    ) -> list[Any]:
+        """Returns rows as plain tuples."""
+        rows, _ = await self._fetch(query, params, connection)
+        return rows
+
+    def _invalidate_catalog(self) -> None:
+        self.catalog_dirty = True
+        self.catalog.invalidate()
+
+    async def _get_catalog(self) -> Catalog:
+        """Returns catalog, (re)loads it from database if it's not loaded yet or was invalidated."""
+        if self.catalog.loaded:
+            return self.catalog
+
+        async with self.catalog.lock:
+            if not self.catalog.loaded:
+                await self._load_catalog()
+
+        return self.catalog
+
+    async def _load_catalog(self) -> None:
+        # Catalog is loaded from writer connection, so it includes inserts that aren't committed yet.
+        drinks = await self._fetchall(
+            Drink,
+            """
+            SELECT id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail
+            FROM drinks
+            ORDER BY rowid;
+            """,
+            connection=self.connection,
+        )
+        glasses = await self._fetchall(Glass, 'SELECT id, name FROM glasses ORDER BY rowid;', connection=self.connection)
+        ingredients = await self._fetchall(
+            Ingredient,
+            'SELECT id, name, description, type, alcohol FROM ingredients ORDER BY rowid;',
+            connection=self.connection,
+        )
+
+        query = """
+        SELECT drink_id, ingredient_id, measure
+        FROM drink_ingredients
+        ORDER BY rowid;
+        """
+        rows = await self._fetchrows(query, connection=self.connection)
+        drink_ingredients = [(row[0], row[1], row[2]) for row in rows]
 
-        return [container(**i) for i in row]
+        self.catalog.build(drinks, glasses, ingredients, drink_ingredients)
@@ -1,4 +1,6 @@
-from typing import Optional
+from typing import Iterable, Optional
+
+from typedefs import ItemType
 
 from ..models import Drink
 from .base import Mixin
@@ -31,31 +33,43 @@ class DrinksMixin(Mixin):
         await self.connection.execute(
             query, (id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail)
         )
+        self._invalidate_catalog()
 
-    async def get_drink_by_name(self, name: str) -> list[Drink]:
+    async def upsert_drinks(self, items: Iterable[Drink]) -> None:
+        """Inserts drinks with one `executemany`, existing drinks with same ID are overwritten."""
         query = """
-        SELECT id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail
-        FROM drinks
-        WHERE name LIKE ?;
+        INSERT INTO drinks (id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail)
+        VALUES(?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name, name_alternate = excluded.name_alternate, tags = excluded.tags,
+            category = excluded.category, alcoholic = excluded.alcoholic, glass = excluded.glass,
+            instructions = excluded.instructions, thumbnail = excluded.thumbnail;
         """
 
-        return await self._fetchall(Drink, query, (f'%{name}%',))
+        await self.connection.executemany(
+            query,
+            (
+                (i.id, i.name, i.name_alternate, i.tags, i.category, i.alcoholic, i.glass, i.instructions, i.thumbnail)
+                for i in items
+            ),
+        )
+        self._invalidate_catalog()
 
-    async def get_drink_by_id(self, id: int) -> Drink | None:
-        query = """
-        SELECT id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail
-        FROM drinks
-        WHERE id=?;
-        """
+    async def get_drink_by_name(self, name: str) -> list[Drink]:
+        catalog = await self._get_catalog()
+        return [catalog.drinks[id] for id in catalog.names[ItemType.DRINK].search(name)]
 
-        return await self._fetchone(Drink, query, (id,))
+    async def get_drink_by_id(self, id: int) -> Drink | None:
+        catalog = await self._get_catalog()
+        return catalog.drinks.get(id)
 
     async def get_drink(self, name_or_id: str | int) -> list[Drink] | Drink | None:
         if isinstance(name_or_id, str):
+            name_or_id = name_or_id.strip()
             if name_or_id.isdigit():
                 item = await self.get_drink_by_id(int(name_or_id))
             else:
-                item = await self.get_drink_by_name(name_or_id.strip())
+                item = await self.get_drink_by_name(name_or_id)
         else:
             item = await self.get_drink_by_id(name_or_id)
 
@@ -67,11 +81,7 @@ class DrinksMixin(Mixin):
         return item
 
     async def get_random_drink(self) -> Drink | None:
-        query = """
-        SELECT id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail
-        FROM drinks
-        ORDER BY RANDOM()
-        LIMIT 1;
-        """
+        catalog = await self._get_catalog()
+        id = catalog.random[ItemType.DRINK].choice()
 
-        return await self._fetchone(Drink, query)
+        return catalog.drinks[id] if id is not None else None
@@ -1,3 +1,5 @@
+from typedefs import ItemType
+
 from ..models import Glass
 from .base import Mixin
 
@@ -16,7 +18,8 @@ class GlassesMixin(Mixin):
         RETURNING id, name;
         """
 
-        row = await self._fetchone(Glass, query, (name,))
+        row = await self._fetchone(Glass, query, (name,), connection=self.connection)
+        self._invalidate_catalog()
 
         if not row:
             raise ValueError('Failed to get inserted item.')
@@ -24,29 +27,20 @@ class GlassesMixin(Mixin):
         return row
 
     async def get_glass_by_name(self, name: str) -> list[Glass]:
-        query = """
-        SELECT id, name
-        FROM glasses
-        WHERE name LIKE ?;
-        """
-
-        return await self._fetchall(Glass, query, (f'%{name}%',))
+        catalog = await self._get_catalog()
+        return [catalog.glasses[id] for id in catalog.names[ItemType.GLASS].search(name)]
 
     async def get_glass_by_id(self, id: int) -> Glass | None:
-        query = """
-        SELECT id, name
-        FROM glasses
-        WHERE id=?;
-        """
-
-        return await self._fetchone(Glass, query, (id,))
+        catalog = await self._get_catalog()
+        return catalog.glasses.get(id)
 
     async def get_glass(self, name_or_id: str | int) -> list[Glass] | Glass | None:
         if isinstance(name_or_id, str):
+            name_or_id = name_or_id.strip()
             if name_or_id.isdigit():
                 item = await self.get_glass_by_id(int(name_or_id))
             else:
-                item = await self.get_glass_by_name(name_or_id.strip())
+                item = await self.get_glass_by_name(name_or_id)
         else:
             item = await self.get_glass_by_id(name_or_id)
 
@@ -58,11 +52,7 @@ class GlassesMixin(Mixin):
         return item
 
     async def get_random_glass(self) -> Glass | None:
-        query = """
-        SELECT id, name
-        FROM glasses
-        ORDER BY RANDOM()
-        LIMIT 1;
-        """
+        catalog = await self._get_catalog()
+        id = catalog.random[ItemType.GLASS].choice()
 
-        return await self._fetchone(Glass, query)
+        return catalog.glasses[id] if id is not None else None
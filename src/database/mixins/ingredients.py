@@ -1,4 +1,6 @@
-from typing import Optional
+from typing import Iterable, Optional
+
+from typedefs import ItemType
 
 from ..models import Ingredient
 from .base import Mixin
@@ -25,31 +27,35 @@ class IngredientsMixin(Mixin):
         """
 
         await self.connection.execute(query, (id, name, description, type, alcohol))
+        self._invalidate_catalog()
 
-    async def get_ingredient_by_name(self, name: str) -> list[Ingredient]:
+    async def upsert_ingredients(self, items: Iterable[Ingredient]) -> None:
+        """Inserts ingredients with one `executemany`, existing ingredients with same ID are overwritten."""
         query = """
-        SELECT id, name, description, type, alcohol
-        FROM ingredients
-        WHERE name LIKE ?;
+        INSERT INTO ingredients (id, name, description, type, alcohol)
+        VALUES(?, ?, ?, ?, ?)
+        ON CONFLICT(id) DO UPDATE SET
+            name = excluded.name, description = excluded.description, type = excluded.type, alcohol = excluded.alcohol;
         """
 
-        return await self._fetchall(Ingredient, query, (f'%{name}%',))
+        await self.connection.executemany(query, ((i.id, i.name, i.description, i.type, i.alcohol) for i in items))
+        self._invalidate_catalog()
 
-    async def get_ingredient_by_id(self, id: int) -> Ingredient | None:
-        query = """
-        SELECT id, name, description, type, alcohol
-        FROM ingredients
-        WHERE id=?;
-        """
+    async def get_ingredient_by_name(self, name: str) -> list[Ingredient]:
+        catalog = await self._get_catalog()
+        return [catalog.ingredients[id] for id in catalog.names[ItemType.INGREDIENT].search(name)]
 
-        return await self._fetchone(Ingredient, query, (id,))
+    async def get_ingredient_by_id(self, id: int) -> Ingredient | None:
+        catalog = await self._get_catalog()
+        return catalog.ingredients.get(id)
 
     async def get_ingredient(self, name_or_id: str | int) -> list[Ingredient] | Ingredient | None:
         if isinstance(name_or_id, str):
+            name_or_id = name_or_id.strip()
             if name_or_id.isdigit():
                 item = await self.get_ingredient_by_id(int(name_or_id))
             else:
-                item = await self.get_ingredient_by_name(name_or_id.strip())
+                item = await self.get_ingredient_by_name(name_or_id)
         else:
             item = await self.get_ingredient_by_id(name_or_id)
 
@@ -61,11 +67,7 @@ class IngredientsMixin(Mixin):
         return item
 
     async def get_random_ingredient(self) -> Ingredient | None:
-        query = """
-        SELECT id, name, description, type, alcohol
-        FROM ingredients
-        ORDER BY RANDOM()
-        LIMIT 1;
-        """
+        catalog = await self._get_catalog()
+        id = catalog.random[ItemType.INGREDIENT].choice()
 
-        return await self._fetchone(Ingredient, query)
+        return catalog.ingredients[id] if id is not None else None
@@ -1,9 +1,14 @@
+import copy
+from dataclasses import asdict
 from datetime import datetime, timezone
+from typing import Any, Callable, Iterable, Mapping, Optional, Sequence, TypeVar, cast
 
+from caching import LRUCache
+from exceptions import NotEnoughItemsError
 from typedefs import ItemType
 
 from ..models import UserDrink, UserGlass, UserIngredient, UserInventory, UserSetItemSignature
-from .base import Mixin
+from .base import ContainerT, Mixin, in_transaction
 
 # fmt: off
 __all__ = (
@@ -11,8 +16,51 @@ __all__ = (
 )
 # fmt: on
 
+# `(amount, name, id)` of last item on previous page, inventory is ordered by `amount DESC, name, id`.
+InventoryKey = tuple[float, str, int]
+
+CATALOG_TABLES = {
+    ItemType.DRINK: 'drinks',
+    ItemType.GLASS: 'glasses',
+    ItemType.INGREDIENT: 'ingredients',
+}
+
+USER_ITEM_COLUMNS = {
+    ItemType.DRINK: 'id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail, amount',
+    ItemType.GLASS: 'id, name, amount',
+    ItemType.INGREDIENT: 'id, name, description, type, alcohol, amount',
+}
+
+USER_ITEM_CONTAINERS: dict[ItemType, Callable[..., UserDrink | UserGlass | UserIngredient]] = {
+    ItemType.DRINK: UserDrink,
+    ItemType.GLASS: UserGlass,
+    ItemType.INGREDIENT: UserIngredient,
+}
+
+INVENTORY_CACHE_SIZE = 1024
+INVENTORY_CACHE_TTL = 300  # Seconds, limits how long inventory changed outside of bot can stay stale.
+
+UserItemT = TypeVar('UserItemT', UserDrink, UserGlass, UserIngredient)
+
+
+def _copy_items(items: dict[int, UserItemT]) -> dict[int, UserItemT]:
+    """Copies cached items, so callers can't change cache by modifying them."""
+    return {id: copy.copy(item) for id, item in items.items()}
+
 
 class UsersMixin(Mixin):
+    # Inventory snapshots by user ID, kept up to date by writes of this mixin.
+    inventory_cache: LRUCache[int, UserInventory]
+    # Users which cached inventory was changed by current transaction, they're dropped from cache on rollback.
+    inventory_touched: set[int]
+    # Incremented on every write, inventory loaded while it changed isn't cached as it could miss the write.
+    inventory_writes: int
+
+    def _init_inventory_cache(self) -> None:
+        self.inventory_cache = LRUCache(INVENTORY_CACHE_SIZE, INVENTORY_CACHE_TTL)
+        self.inventory_touched = set()
+        self.inventory_writes = 0
+
     async def create_user(self, id: int, name: str) -> None:
         query = """
         INSERT INTO users (id, name, created)
@@ -22,38 +70,117 @@ class UsersMixin(Mixin):
 
         await self.connection.execute(query, (id, name, datetime.now(tz=timezone.utc)))
 
-    async def get_user_drinks(self, id: int) -> dict[int, UserDrink]:
+    async def _load_user_inventory(self, id: int) -> UserInventory:
+        """Loads all inventory of user in one query, rows are tagged with their type and split by it."""
         query = """
-        SELECT id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail, amount
+        SELECT 'drink', id, name, name_alternate, tags, category, alcoholic, glass, instructions, thumbnail,
+            NULL, NULL, NULL, amount
         FROM drink_inventory
-        LEFT JOIN drinks ON drink_inventory.drink_id = drinks.id
+        JOIN drinks ON drink_inventory.drink_id = drinks.id
         WHERE user_id=? AND amount > 0
-        ORDER BY amount DESC, name;
-        """
-
-        return {item.id: item for item in await self._fetchall(UserDrink, query, (id,))}
-
-    async def get_user_glasses(self, id: int) -> dict[int, UserGlass]:
-        query = """
-        SELECT id, name, amount
+        UNION ALL
+        SELECT 'glass', id, name, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+            NULL, NULL, NULL, amount
         FROM glass_inventory
-        LEFT JOIN glasses ON glass_inventory.glass_id = glasses.id
+        JOIN glasses ON glass_inventory.glass_id = glasses.id
         WHERE user_id=? AND amount > 0
-        ORDER BY amount DESC, name;
+        UNION ALL
+        SELECT 'ingredient', id, name, NULL, NULL, NULL, NULL, NULL, NULL, NULL,
+            description, type, alcohol, amount
+        FROM ingredient_inventory
+        JOIN ingredients ON ingredient_inventory.ingredient_id = ingredients.id
+        WHERE user_id=? AND amount > 0
+        ORDER BY amount DESC, name, id;
         """
 
-        return {item.id: item for item in await self._fetchall(UserGlass, query, (id,))}
+        rows = await self._fetchrows(query, (id, id, id))
 
-    async def get_user_ingredients(self, id: int) -> dict[int, UserIngredient]:
-        query = """
-        SELECT id, name, description, type, alcohol, amount
-        FROM ingredient_inventory
-        LEFT JOIN ingredients ON ingredient_inventory.ingredient_id = ingredients.id
-        WHERE user_id=? AND amount > 0
-        ORDER BY amount DESC, name;
+        # Declared types of compound select come from its first part, so booleans of non drink rows aren't converted.
+        inventory = UserInventory({}, {}, {})
+        for row in rows:
+            if row[0] == ItemType.DRINK:
+                inventory.drinks[row[1]] = UserDrink(
+                    row[1], row[2], row[3], row[4], row[5], bool(row[6]), row[7], row[8], row[9], row[13]
+                )
+            elif row[0] == ItemType.GLASS:
+                inventory.glasses[row[1]] = UserGlass(row[1], row[2], row[13])
+            elif row[0] == ItemType.INGREDIENT:
+                inventory.ingredients[row[1]] = UserIngredient(row[1], row[2], row[10], row[11], bool(row[12]), row[13])
+
+        return inventory
+
+    async def _get_cached_inventory(self, id: int) -> UserInventory:
+        """Returns cached inventory of user, loads it on miss. It's shared with cache, so it must not be modified.
+
+        Inventory changed by open transaction is read from database outside of it, so it doesn't see uncommitted items.
         """
+        if id in self.inventory_touched and not in_transaction.get():
+            return await self._load_user_inventory(id)
+
+        inventory = self.inventory_cache.get(id)
+        if inventory is not None:
+            return inventory
+
+        writes = self.inventory_writes
+        inventory = await self._load_user_inventory(id)
+
+        if writes == self.inventory_writes:
+            self.inventory_cache.set(id, inventory)
+            if in_transaction.get():
+                self.inventory_touched.add(id)
+
+        return inventory
+
+    async def _update_cached_inventory(self, type: ItemType, rows: Iterable[tuple[int, int, float]]) -> None:
+        """Writes `(user ID, item ID, new amount)` rows through to cached inventories."""
+        self.inventory_writes += 1
+
+        changed: dict[int, UserInventory] = {}
+        for user_id, item_id, amount in rows:
+            self.inventory_touched.add(user_id)
+
+            inventory = self.inventory_cache.peek(user_id)
+            if inventory is None:
+                continue
 
-        return {item.id: item for item in await self._fetchall(UserIngredient, query, (id,))}
+            items = cast(dict[int, Any], inventory[list(ItemType).index(type)])
+            if amount <= 0:
+                items.pop(item_id, None)
+            elif item_id in items:
+                items[item_id].amount = amount
+            else:
+                item = (await self._get_catalog()).items(type).get(item_id)
+                if item is None:
+                    self.inventory_cache.pop(user_id)
+                    continue
+
+                items[item_id] = USER_ITEM_CONTAINERS[type](**asdict(item), amount=amount)
+
+            changed[user_id] = inventory
+
+        for inventory in changed.values():
+            items = cast(dict[int, Any], inventory[list(ItemType).index(type)])
+            # Same order as `ORDER BY amount DESC, name, id` over NOCASE names.
+            ordered = sorted(items.values(), key=lambda i: (-i.amount, i.name.lower(), i.id))
+            items.clear()
+            items.update((i.id, i) for i in ordered)
+
+    def _discard_cached_inventory(self, commit: bool) -> None:
+        """Forgets users changed by transaction, their cached inventories are dropped if it didn't `commit`."""
+        if not commit:
+            for id in self.inventory_touched:
+                self.inventory_cache.pop(id)
+
+        self.inventory_touched.clear()
+
+    async def get_user_drinks(self, id: int) -> dict[int, UserDrink]:
+        return _copy_items((await self._get_cached_inventory(id)).drinks)
+
+    async def get_user_glasses(self, id: int) -> dict[int, UserGlass]:
+        return _copy_items((await self._get_cached_inventory(id)).glasses)
+
+    async def get_user_ingredients(self, id: int) -> dict[int, UserIngredient]:
+        return _copy_items((await self._get_cached_inventory(id)).ingredients)
 
     async def get_user_items(self, type: ItemType, id: int):
         if type == ItemType.INGREDIENT:
@@ -65,7 +192,79 @@ class UsersMixin(Mixin):
 
         return data
 
-    async def set_user_items(self, type: ItemType, *values: UserSetItemSignature) -> None:
+    async def count_user_items(self, type: ItemType, id: int) -> int:
+        query = f"""
+        SELECT COUNT(*)
+        FROM {type}_inventory
+        JOIN {CATALOG_TABLES[type]} ON {type}_inventory.{type}_id = {CATALOG_TABLES[type]}.id
+        WHERE user_id=? AND amount > 0;
+        """
+
+        return (await self._fetchcolumn(query, (id,)))[0]
+
+    async def _get_user_items_page(
+        self,
+        container: type[ContainerT],
+        type: ItemType,
+        id: int,
+        limit: int,
+        after: Optional[InventoryKey] = None,
+        offset: int = 0,
+    ) -> list[ContainerT]:
+        query = f"""
+        SELECT {USER_ITEM_COLUMNS[type]}
+        FROM {type}_inventory
+        JOIN {CATALOG_TABLES[type]} ON {type}_inventory.{type}_id = {CATALOG_TABLES[type]}.id
+        WHERE user_id=? AND amount > 0
+        {'AND (amount < ? OR (amount = ? AND (name > ? OR (name = ? AND id > ?))))' if after else ''}
+        ORDER BY amount DESC, name, id
+        LIMIT ? OFFSET ?;
+        """
+
+        params: list[int | float | str] = [id]
+        if after:
+            amount, name, item_id = after
+            params.extend((amount, amount, name, name, item_id))
+        params.extend((limit, offset))
+
+        return await self._fetchall(container, query, params)
+
+    async def get_user_drinks_page(
+        self,
+        id: int,
+        limit: int,
+        after: Optional[InventoryKey] = None,
+        offset: int = 0,
+    ) -> list[UserDrink]:
+        """Returns `limit` items after `after` key if it's given, otherwise after `offset` items."""
+        return await self._get_user_items_page(UserDrink, ItemType.DRINK, id, limit, after, offset)
+
+    async def get_user_glasses_page(
+        self,
+        id: int,
+        limit: int,
+        after: Optional[InventoryKey] = None,
+        offset: int = 0,
+    ) -> list[UserGlass]:
+        """Returns `limit` items after `after` key if it's given, otherwise after `offset` items."""
+        return await self._get_user_items_page(UserGlass, ItemType.GLASS, id, limit, after, offset)
+
+    async def get_user_ingredients_page(
+        self,
+        id: int,
+        limit: int,
+        after: Optional[InventoryKey] = None,
+        offset: int = 0,
+    ) -> list[UserIngredient]:
+        """Returns `limit` items after `after` key if it's given, otherwise after `offset` items."""
+        return await self._get_user_items_page(UserIngredient, ItemType.INGREDIENT, id, limit, after, offset)
+
+    async def _upsert_user_items(
+        self,
+        type: ItemType,
+        values: Sequence[UserSetItemSignature],
+        relative: bool,
+    ) -> dict[int, float]:
         if not values:
             raise ValueError('Not values been provided.')
 
@@ -73,7 +272,8 @@ class UsersMixin(Mixin):
         INSERT INTO {type}_inventory (user_id, {type}_id, amount, modified)
         VALUES {','.join(['(?, ?, ?, ?)' for _ in values])}
         ON CONFLICT(user_id, {type}_id) DO UPDATE SET
-            amount = excluded.amount, modified = excluded.modified;
+            amount = {'amount + ' if relative else ''}excluded.amount, modified = excluded.modified
+        RETURNING user_id, {type}_id, amount;
         """
 
         utcnow = datetime.now(tz=timezone.utc)
@@ -81,7 +281,78 @@ class UsersMixin(Mixin):
         for value in values:
             params.extend((value.user_id, value.item_id, value.amount, utcnow))
 
-        await self.connection.execute(query, params)
+        rows = [(row[0], row[1], row[2]) for row in await self._fetchrows(query, params, connection=self.connection)]
+
+        await self._update_cached_inventory(type, rows)
+        return {row[1]: row[2] for row in rows}
+
+    async def set_user_items(self, type: ItemType, *values: UserSetItemSignature) -> None:
+        await self._upsert_user_items(type, values, relative=False)
+
+    async def add_user_items(self, type: ItemType, *values: UserSetItemSignature) -> dict[int, float]:
+        """Adds `amount` of each value to current amount instead of overwriting it, so it's safe with stale reads.
+
+        Returns new amounts by item ID.
+        """
+        return await self._upsert_user_items(type, values, relative=True)
+
+    async def award_item(self, user_id: int, type: ItemType, item_id: int, delta: float = 1) -> float:
+        """Adds `delta` of item to user inventory in one statement and returns new amount."""
+        query = f"""
+        INSERT INTO {type}_inventory (user_id, {type}_id, amount, modified)
+        VALUES (?, ?, ?, ?)
+        ON CONFLICT(user_id, {type}_id) DO UPDATE SET
+            amount = amount + excluded.amount, modified = excluded.modified
+        RETURNING amount;
+        """
+
+        params = (user_id, item_id, delta, datetime.now(tz=timezone.utc))
+        amount: float = (await self._fetchcolumn(query, params, connection=self.connection))[0]
+
+        await self._update_cached_inventory(type, ((user_id, item_id, amount),))
+        return amount
+
+    async def take_user_items(self, type: ItemType, user_id: int, amounts: Mapping[int, float]) -> None:
+        """Subtracts `amounts` of items by ID from user only where user has enough of them, in one statement.
+
+        Should be called inside transaction, raises `NotEnoughItemsError` when user doesn't have enough of any item,
+        transaction has to be rolled back then as other items could be already taken.
+        """
+        if not amounts:
+            return
+
+        query = f"""
+        UPDATE {type}_inventory SET amount = {type}_inventory.amount - changes.column2, modified = ?
+        FROM (VALUES {','.join(['(?, ?)' for _ in amounts])}) AS changes
+        WHERE user_id = ? AND {type}_id = changes.column1 AND {type}_inventory.amount >= changes.column2
+        RETURNING user_id, {type}_id, {type}_inventory.amount;
+        """
+
+        params: list[int | float | datetime] = [datetime.now(tz=timezone.utc)]
+        for item_id, amount in amounts.items():
+            params.extend((item_id, amount))
+        params.append(user_id)
+
+        rows = [(row[0], row[1], row[2]) for row in await self._fetchrows(query, params, connection=self.connection)]
+
+        await self._update_cached_inventory(type, rows)
+
+        if len(rows) != len(amounts):
+            taken = {row[1] for row in rows}
+            item_id = next(i for i in amounts if i not in taken)
+            item = (await self._get_catalog()).items(type).get(item_id)
+            raise NotEnoughItemsError(user_id, item.name if item else str(item_id))
+
+    async def move_user_items(self, type: ItemType, sender: int, recipient: int, amounts: Mapping[int, float]) -> None:
+        """Moves `amounts` of items by ID from `sender` to `recipient` with relative updates, so it's safe with stale reads.
+
+        Should be called inside transaction, see `take_user_items`.
+        """
+        if not amounts:
+            return
+
+        await self.take_user_items(type, sender, amounts)
+        await self.add_user_items(type, *(UserSetItemSignature(recipient, id, amount) for id, amount in amounts.items()))
 
     async def set_user_drinks(self, *values: UserSetItemSignature) -> None:
         return await self.set_user_items(ItemType.DRINK, *values)
@@ -92,11 +363,21 @@ class UsersMixin(Mixin):
     async def set_user_ingredients(self, *values: UserSetItemSignature) -> None:
         return await self.set_user_items(ItemType.INGREDIENT, *values)
 
+    async def add_user_drinks(self, *values: UserSetItemSignature) -> dict[int, float]:
+        return await self.add_user_items(ItemType.DRINK, *values)
+
+    async def add_user_glasses(self, *values: UserSetItemSignature) -> dict[int, float]:
+        return await self.add_user_items(ItemType.GLASS, *values)
+
+    async def add_user_ingredients(self, *values: UserSetItemSignature) -> dict[int, float]:
+        return await self.add_user_items(ItemType.INGREDIENT, *values)
+
     async def get_user_inventory(self, id: int) -> UserInventory:
+        inventory = await self._get_cached_inventory(id)
         return UserInventory(
-            await self.get_user_drinks(id),
-            await self.get_user_glasses(id),
-            await self.get_user_ingredients(id),
+            _copy_items(inventory.drinks),
+            _copy_items(inventory.glasses),
+            _copy_items(inventory.ingredients),
         )
 
     async def set_user_inventory(self, id: int, inventory: UserInventory) -> None:
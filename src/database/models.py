@@ -61,3 +61,13 @@ class UserInventory(NamedTuple):  # NamedTuple instead of dataclass for easier c
     drinks: dict[int, UserDrink]
     glasses: dict[int, UserGlass]
     ingredients: dict[int, UserIngredient]
+
+
+class CraftCandidate(NamedTuple):
+    drink: Drink
+    missing_ingredients: int
+    has_glass: bool
+
+    @property
+    def craftable(self) -> bool:
+        return self.has_glass and not self.missing_ingredients
@@ -0,0 +1,67 @@
+import bisect
+import random
+from typing import Generic, Hashable, Iterable, Mapping, Optional, TypeVar
+
+# fmt: off
+__all__ = (
+    'RandomSelector',
+)
+# fmt: on
+
+T = TypeVar('T', bound=Hashable)
+
+
+class RandomSelector(Generic[T]):
+    """Dense array of items with constant time uniform random selection.
+
+    If any item has weight other than `1.0` selection becomes weighted and takes `O(log n)` with binary search
+    over cumulative weights.
+    """
+
+    def __init__(
+        self,
+        items: Iterable[T] = (),
+        weights: Optional[Mapping[T, float]] = None,
+        rng: Optional[random.Random] = None,
+    ) -> None:
+        self.items: list[T] = []
+        self.cum_weights: list[float] = []
+        self.weighted = False
+        self.rng = rng or random.Random()
+
+        for item in items:
+            self.add(item, weights.get(item, 1.0) if weights else 1.0)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    @property
+    def total_weight(self) -> float:
+        return self.cum_weights[-1] if self.cum_weights else 0.0
+
+    def add(self, item: T, weight: float = 1.0) -> None:
+        if weight < 0:
+            raise ValueError('Weight cannot be negative.')
+
+        self.items.append(item)
+        self.cum_weights.append(self.total_weight + weight)
+        self.weighted = self.weighted or weight != 1.0
+
+    def choice(self) -> T | None:
+        if not self.items:
+            return None
+        elif not self.weighted:
+            return self.items[self.rng.randrange(len(self.items))]
+
+        total = self.total_weight
+        if total <= 0:
+            return None
+
+        index = bisect.bisect_right(self.cum_weights, self.rng.random() * total)
+        return self.items[min(index, len(self.items) - 1)]
+
+    def choices(self, k: int) -> list[T]:
+        if not self.items or self.total_weight <= 0:
+            return []
+
+        return self.rng.choices(self.items, cum_weights=self.cum_weights if self.weighted else None, k=k)
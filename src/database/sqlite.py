@@ -1,16 +1,24 @@
+import asyncio
+import contextlib
 import datetime
-import sqlite3
+import itertools
+import logging
+import re
+from contextvars import Token
 from datetime import datetime
 from types import TracebackType
-from typing import Optional, Self, Sequence
+from typing import AsyncIterator, Iterable, Mapping, Optional, Self, Sequence
 
 import aiosqlite
 
 from typedefs import ItemType
 
-from .init import INIT_QUERY
+from .catalog import Catalog
+from .init import DEFERRABLE_INDEXES, INIT_QUERY, MIGRATIONS
+from .locks import KeyedLock
 from .mixins import DrinksMixin, GlassesMixin, IngredientsMixin, UsersMixin
-from .models import Drink, DrinkIngredient
+from .mixins.base import in_transaction
+from .models import CraftCandidate, Drink, DrinkIngredient, Glass, Ingredient
 
 # fmt: off
 __all__ = (
@@ -18,14 +26,56 @@ __all__ = (
 )
 # fmt: on
 
+logger = logging.getLogger(__name__)
+
+PRAGMA_REGEXP = re.compile(r'-?\w+')
+
 
 class Database(DrinksMixin, GlassesMixin, IngredientsMixin, UsersMixin):
-    def __init__(self, connection: aiosqlite.Connection):
+    def __init__(
+        self,
+        connection: aiosqlite.Connection,
+        pragmas: Optional[Mapping[str, str | int]] = None,
+        readers: Sequence[aiosqlite.Connection] = (),
+        *,
+        slow_query_threshold: Optional[float] = None,
+        slow_query_sample: float = 1.0,
+    ):
+        """`connection` is used for writes and transactions, `readers` are used in round-robin for other reads.
+
+        Reads slower than `slow_query_threshold` seconds are logged with their plan, see `Mixin.slow_query_threshold`.
+        """
         self.connection = connection
-        self.connection.row_factory = sqlite3.Row
+        self.readers = list(readers)
+        self.readers_cycle = itertools.cycle(self.readers)
+
+        # Rows are plain tuples, `_fetchone`/`_fetchall` build models from them positionally.
+        for i in (self.connection, *self.readers):
+            i.row_factory = None
+
+        self.pragmas = dict(pragmas or {})
+        self.catalog = Catalog()
+        self.catalog_dirty = False
+
+        self.slow_query_threshold = slow_query_threshold
+        self.slow_query_sample = slow_query_sample
+
+        self._init_inventory_cache()
+        self.catalog.listeners.append(self.inventory_cache.clear)  # Cached inventories contain catalog items.
+
+        self.write_lock = asyncio.Lock()
+        self.transaction_token: Token[bool] | None = None
+
+        # Held by read-check-write flows so concurrent commands of same user don't overwrite each other.
+        self.lock_users = KeyedLock()
 
     async def __aenter__(self) -> Self:
-        """Enters transaction that will commit on exit or rollback on error."""
+        """Enters transaction that will commit on exit or rollback on error.
+
+        Only one transaction is open at a time, reads inside of it use writer connection.
+        """
+        await self.write_lock.acquire()
+        self.transaction_token = in_transaction.set(True)
         return self
 
     async def __aexit__(
@@ -34,14 +84,66 @@ class Database(DrinksMixin, GlassesMixin, IngredientsMixin, UsersMixin):
         exc_value: BaseException | None,
         traceback: TracebackType | None,
     ) -> None:
-        if exc_type is None:
-            await self.connection.commit()
-        else:
-            await self.connection.rollback()
+        try:
+            if exc_type is None:
+                await self.connection.commit()
+                self._discard_cached_inventory(commit=True)
+            else:
+                await self.connection.rollback()
+                self._discard_cached_inventory(commit=False)
+                if self.catalog_dirty:
+                    self.catalog.invalidate()  # Rolled back inserts could be already loaded into catalog.
+        finally:
+            self.catalog_dirty = False
+            if self.transaction_token is not None:
+                in_transaction.reset(self.transaction_token)
+                self.transaction_token = None
+            self.write_lock.release()
 
     async def init(self) -> None:
+        settings = await self.apply_pragmas(self.connection)
+        logger.info('SQLite settings: %s', ', '.join(f'{key}={value}' for key, value in settings.items()))
+
+        for reader in self.readers:
+            await self.apply_pragmas(reader)
+            await reader.execute('PRAGMA query_only = ON;')
+        logger.info('SQLite readers: %d', len(self.readers))
+
         await self.connection.executescript(INIT_QUERY)
         await self.connection.commit()
+        await self.migrate()
+
+        await self._get_catalog()
+
+    async def apply_pragmas(self, connection: aiosqlite.Connection) -> dict[str, str | int]:
+        """Applies `pragmas` to connection and returns values it actually uses."""
+        settings: dict[str, str | int] = {}
+
+        for key, value in self.pragmas.items():
+            if not PRAGMA_REGEXP.fullmatch(key) or not PRAGMA_REGEXP.fullmatch(str(value)):
+                raise ValueError(f'Invalid pragma {key!r} = {value!r}.')
+
+            await connection.execute(f'PRAGMA {key} = {value};')
+            async with connection.execute(f'PRAGMA {key};') as cursor:
+                row = await cursor.fetchone()
+
+            settings[key] = row[0] if row else value
+
+        return settings
+
+    async def migrate(self) -> None:
+        """Applies migrations newer than `PRAGMA user_version`, each one in its own transaction."""
+        version: int = (await self._fetchcolumn('PRAGMA user_version;', connection=self.connection))[0]
+
+        for number, script in enumerate(MIGRATIONS[version:], version + 1):
+            await self.connection.executescript(
+                f'BEGIN TRANSACTION;\n{script}\nPRAGMA user_version = {number};\nCOMMIT;',
+            )
+            logger.info('Database migrated to version %s.', number)
+
+    async def get_catalog(self) -> Catalog:
+        """Returns loaded catalog, its items are shared and shouldn't be modified."""
+        return await self._get_catalog()
 
     async def get_random_item(self, type: ItemType):
         if type == ItemType.INGREDIENT:
@@ -54,6 +156,18 @@ class Database(DrinksMixin, GlassesMixin, IngredientsMixin, UsersMixin):
         assert data
         return data
 
+    async def get_random_items(self, type: ItemType, k: int) -> list[Drink | Glass | Ingredient]:
+        """Returns `k` random items of `type`, same item can be returned multiple times."""
+        catalog = await self._get_catalog()
+        items = catalog.items(type)
+
+        return [items[id] for id in catalog.random[type].choices(k)]
+
+    async def set_random_weights(self, type: ItemType, weights: Mapping[int, float]) -> None:
+        """Sets weights used by `get_random_item` for items by ID, items without weight default to `1.0`."""
+        catalog = await self._get_catalog()
+        catalog.set_weights(type, weights)
+
     async def get_item(self, type: ItemType, name_or_id: str | int):
         if type == ItemType.INGREDIENT:
             data = await self.get_ingredient(name_or_id)
@@ -64,6 +178,42 @@ class Database(DrinksMixin, GlassesMixin, IngredientsMixin, UsersMixin):
 
         return data
 
+    async def resolve_items(
+        self, type: ItemType, names_or_ids: Sequence[str | int]
+    ) -> list[Drink | Glass | Ingredient | None]:
+        """Resolves names or IDs of items in one pass over catalog, same way as `get_item` but without database queries.
+
+        Results are in order of `names_or_ids`, entries that weren't found are None. Name resolves to first item which
+        name contains it.
+        """
+        catalog = await self._get_catalog()
+        items = catalog.items(type)
+        index = catalog.names[type]
+
+        resolved: dict[str | int, Drink | Glass | Ingredient | None] = {}
+        out: list[Drink | Glass | Ingredient | None] = []
+
+        for name_or_id in names_or_ids:
+            key = name_or_id.strip() if isinstance(name_or_id, str) else name_or_id
+
+            if key not in resolved:
+                if isinstance(key, int) or key.isdigit():
+                    resolved[key] = items.get(int(key))
+                else:
+                    ids = index.search(key)
+                    resolved[key] = items[ids[0]] if ids else None
+
+            out.append(resolved[key])
+
+        return out
+
+    async def complete_item_name(self, type: ItemType, current: str, limit: int = 25) -> list[Drink | Glass | Ingredient]:
+        """Returns items for autocomplete, names starting with `current` go first."""
+        catalog = await self._get_catalog()
+        items = catalog.items(type)
+
+        return [items[id] for id in catalog.complete(type, current.strip(), limit)]
+
     async def insert_drink_ingredient(self, drink_id: int, ingredient_id: int, measure: Optional[str]) -> None:
         query = """
         INSERT INTO drink_ingredients (drink_id, ingredient_id, measure)
@@ -71,6 +221,37 @@ class Database(DrinksMixin, GlassesMixin, IngredientsMixin, UsersMixin):
         """
 
         await self.connection.execute(query, (drink_id, ingredient_id, measure))
+        self._invalidate_catalog()
+
+    async def upsert_drink_ingredients(self, items: Iterable[tuple[int, int, Optional[str]]]) -> None:
+        """Inserts `(drink ID, ingredient ID, measure)` rows with one `executemany`, measure of existing ones is updated."""
+        query = """
+        INSERT INTO drink_ingredients (drink_id, ingredient_id, measure)
+        VALUES (?, ?, ?)
+        ON CONFLICT(drink_id, ingredient_id) DO UPDATE SET measure = excluded.measure;
+        """
+
+        await self.connection.executemany(query, items)
+        self._invalidate_catalog()
+
+    @contextlib.asynccontextmanager
+    async def deferred_indexes(self) -> AsyncIterator[None]:
+        """Drops indexes that upserts don't need and creates them again on exit, so bulk writes don't update them per row.
+
+        Should be used inside transaction. Drops are made in it, so rollback restores dropped indexes if writes fail.
+        """
+        # sqlite3 begins transaction implicitly only before DML, `DROP INDEX` would be committed right away.
+        if not self.connection.in_transaction:
+            await self.connection.execute('BEGIN;')
+
+        for name in DEFERRABLE_INDEXES:
+            await self.connection.execute(f'DROP INDEX IF EXISTS "{name}";')
+
+        try:
+            yield
+        finally:
+            for query in DEFERRABLE_INDEXES.values():
+                await self.connection.execute(query)
 
     async def remove_drink_ingredient(self, drink_id: int, ingredient_id: int) -> None:
         query = """
@@ -78,72 +259,98 @@ class Database(DrinksMixin, GlassesMixin, IngredientsMixin, UsersMixin):
         """
 
         await self.connection.execute(query, (drink_id, ingredient_id))
+        self._invalidate_catalog()
 
     async def get_drink_ingredients(self, id: int) -> list[DrinkIngredient]:
-        query = """
-        SELECT id, name, description, type, alcohol, measure
-        FROM drink_ingredients
-        INNER JOIN ingredients ON drink_ingredients.ingredient_id = ingredients.id
-        WHERE drink_id=?;
-        """
-
-        return await self._fetchall(DrinkIngredient, query, (id,))
+        catalog = await self._get_catalog()
+        return list(catalog.drink_ingredients.get(id, ()))
 
-    async def search_drinks(
+    def _search_drinks_query(
         self,
-        name: Optional[str] = None,
-        ingredients: Sequence[int] = (),
-        glass: Optional[int] = None,
-    ) -> list[Drink]:
-        query = f"""
-        SELECT d.id, d.name, d.name_alternate, d.tags, d.category, d.alcoholic, d.glass, d.instructions, d.thumbnail
-        FROM drinks AS d
-        {f'JOIN drink_ingredients AS di ON di.drink_id = d.id AND di.ingredient_id in ({",".join("?" for _ in ingredients)})' if ingredients else ''}
-        {'WHERE' if name or glass else ''}
-        {'d.name LIKE ?' if name else ''}
-        {'AND' if name and glass else ''}
-        {'d.glass=?' if glass else ''}
-        GROUP BY d.id
-        {'HAVING COUNT(DISTINCT di.ingredient_id) >= ?' if ingredients else ''}
-        ORDER BY d.name;
+        name: Optional[str],
+        ingredients: Sequence[int],
+        glass: Optional[int],
+        after: Optional[tuple[str, int]] = None,
+    ) -> tuple[str, list[str | int]]:
+        """Returns `FROM ... GROUP BY ... HAVING` part of search query and its parameters.
+
+        Drinks are grouped only when joined with ingredients, so other searches can read `drinks_name` index in order.
         """
-
         params: list[str | int] = []
+        conditions: list[str] = []
+
         if ingredients:
             params.extend(ingredients)
         if name:
+            conditions.append('d.name LIKE ?')
             params.append(f'%{name}%')
         if glass:
+            conditions.append('d.glass=?')
             params.append(glass)
+        if after:
+            conditions.append('(d.name > ? OR (d.name = ? AND d.id > ?))')
+            params.extend((after[0], after[0], after[1]))
         if ingredients:
             params.append(len(ingredients))
 
-        return await self._fetchall(Drink, query, params)
+        query = f"""
+        FROM drinks AS d
+        {f'JOIN drink_ingredients AS di ON di.drink_id = d.id AND di.ingredient_id in ({",".join("?" for _ in ingredients)})' if ingredients else ''}
+        {'WHERE ' + ' AND '.join(conditions) if conditions else ''}
+        {'GROUP BY d.id HAVING COUNT(DISTINCT di.ingredient_id) >= ?' if ingredients else ''}
+        """
 
-    async def get_available_crafts(self, user_id: int) -> list[Drink]:
-        query = """
-        WITH required_ingredients AS (
-            SELECT drink_id, COUNT(ingredient_id) AS required_count
-            FROM drink_ingredients
-            GROUP BY drink_id
-        ),
-        matching_ingredients AS (
-            SELECT di.drink_id, ii.user_id, COUNT(DISTINCT di.ingredient_id) AS matched_count
-            FROM drink_ingredients AS di
-            JOIN ingredient_inventory AS ii ON di.ingredient_id = ii.ingredient_id
-            WHERE user_id = ? AND ii.amount > 0
-            GROUP BY di.drink_id, ii.user_id
-        )
+        return query, params
+
+    async def search_drinks(
+        self,
+        name: Optional[str] = None,
+        ingredients: Sequence[int] = (),
+        glass: Optional[int] = None,
+        *,
+        limit: Optional[int] = None,
+        after: Optional[tuple[str, int]] = None,
+        offset: int = 0,
+    ) -> list[Drink]:
+        """Returns drinks ordered by name, `after` is `(name, id)` of last drink on previous page."""
+        search_query, params = self._search_drinks_query(name, ingredients, glass, after)
+
+        query = f"""
         SELECT d.id, d.name, d.name_alternate, d.tags, d.category, d.alcoholic, d.glass, d.instructions, d.thumbnail
-        FROM drinks AS d
-        JOIN glass_inventory ON d.glass = glass_inventory.glass_id
-        JOIN required_ingredients AS ri ON d.id = ri.drink_id
-        JOIN matching_ingredients AS mi ON d.id = mi.drink_id
-        WHERE mi.matched_count = ri.required_count
-        ORDER BY d.name;
+        {search_query}
+        ORDER BY d.name, d.id
+        LIMIT ? OFFSET ?;
+        """
+        params.extend((limit if limit is not None else -1, offset))
+
+        return await self._fetchall(Drink, query, params)
+
+    async def count_search_drinks(
+        self,
+        name: Optional[str] = None,
+        ingredients: Sequence[int] = (),
+        glass: Optional[int] = None,
+    ) -> int:
+        search_query, params = self._search_drinks_query(name, ingredients, glass)
+
+        query = f"""
+        SELECT COUNT(*) FROM (
+            SELECT d.id
+            {search_query}
+        );
         """
 
-        return await self._fetchall(Drink, query, (user_id,))
+        return (await self._fetchcolumn(query, params))[0]
+
+    async def get_craft_candidates(self, user_id: int, max_missing: int = 0) -> list[CraftCandidate]:
+        """Returns drinks user misses at most `max_missing` ingredients for, sorted by missing count and name."""
+        catalog = await self._get_catalog()
+        inventory = await self._get_cached_inventory(user_id)
+
+        return catalog.craft_candidates(list(inventory.ingredients), set(inventory.glasses), max_missing)
+
+    async def get_available_crafts(self, user_id: int) -> list[Drink]:
+        return [i.drink for i in await self.get_craft_candidates(user_id) if i.craftable]
 
 
 def adapt_datetime(date: datetime) -> str:
@@ -159,7 +366,7 @@ def adapt_boolean(boolean: bool) -> int:
 
 
 def convert_boolean(val: bytes) -> bool:
-    return bool(int(val.decode()))
+    return val != b'0'  # Stored by `adapt_boolean`, so it's always `b'0'` or `b'1'`.
 
 
 aiosqlite.register_adapter(datetime, adapt_datetime)
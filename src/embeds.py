@@ -1,14 +1,43 @@
+import functools
+import itertools
 import math
 import random
 from datetime import datetime
-from typing import Any, Literal, Optional, Sequence
+from typing import Any, Awaitable, Callable, Generic, Literal, Optional, Sequence, TypeVar, cast, overload
 
 import discord
 from discord import Color, Embed, Member, User
 from yarl import URL
 
-from database.models import Drink, DrinkIngredient, Glass, Ingredient, UserDrink, UserGlass, UserIngredient, UserInventory
-from emojis import Emojis, random_drink_emoji, random_fruit_emoji
+from caching import LRUCache
+from database.mixins.users import InventoryKey
+from database.models import (
+    CraftCandidate,
+    Drink,
+    DrinkIngredient,
+    Glass,
+    Ingredient,
+    UserDrink,
+    UserGlass,
+    UserIngredient,
+    UserInventory,
+)
+from emojis import Emojis, random_drink_emoji, random_fruit_emoji, stable_hash
+from typedefs import ItemType
+
+EMBED_CACHE_SIZE = 2048
+
+# Key is `(item type, item ID, full, style)`, value is serialized embed. Has to be cleared on catalog change.
+EmbedCacheKey = tuple[ItemType, int, bool, Optional[str]]
+embed_cache: LRUCache[EmbedCacheKey, dict[str, Any]] = LRUCache(EMBED_CACHE_SIZE)
+
+_CHANNEL_ORDERS = tuple(itertools.permutations(range(3)))
+
+RowT = TypeVar('RowT')
+KeyT = TypeVar('KeyT')
+
+# `fetch(limit, after, offset)` returns `limit` rows after row with `after` key, or after `offset` rows if key is None.
+PageFetcher = Callable[[int, Optional[KeyT], int], Awaitable[list[RowT]]]
 
 
 class PaginationView(discord.ui.View):
@@ -16,7 +45,7 @@ class PaginationView(discord.ui.View):
 
     def __init__(
         self,
-        pages: Sequence[discord.Embed],
+        pages: 'Pages | AsyncPages[Any, Any]',
         user: discord.Member | discord.User,
         *args: Any,
         **kwargs: Any,
@@ -53,7 +82,7 @@ class PaginationView(discord.ui.View):
         await self.set_page(interaction, self.index)
 
     async def set_page(self, interaction: discord.Interaction, index: int) -> None:
-        page = self.pages[index]
+        page = await self.pages.get(index)
         await interaction.response.edit_message(embed=page, view=self)
 
     async def on_timeout(self) -> None:
@@ -64,12 +93,27 @@ class PaginationView(discord.ui.View):
 
 
 def _random_color(max_total: int = 400, seed: Optional[str] = None) -> Color:
-    random.seed(seed)
-    r = random.randint(0, 255)
-    g = random.randint(0, min(max_total - r, 255))
-    b = random.randint(0, min(max_total - r - g, 255))
+    """Returns random color with channels sum up to `max_total`, same `seed` always gives same color."""
+    if seed is None:
+        return Color(_color_value(random.getrandbits(64), max_total))
+
+    return Color(_seeded_color_value(seed, max_total))
+
+
+@functools.lru_cache(maxsize=4096)
+def _seeded_color_value(seed: str, max_total: int) -> int:
+    return _color_value(stable_hash(seed), max_total)
+
+
+def _color_value(bits: int, max_total: int) -> int:
+    """Makes RGB value from 64 random `bits`, channels sum up to `max_total` and come in random order."""
+    r = bits % 256
+    g = (bits >> 8) % (max(min(max_total - r, 255), 0) + 1)
+    b = (bits >> 16) % (max(min(max_total - r - g, 255), 0) + 1)
 
-    return Color.from_rgb(*random.sample([r, g, b], 3))
+    channels = (r, g, b)
+    red, green, blue = (channels[i] for i in _CHANNEL_ORDERS[(bits >> 24) % len(_CHANNEL_ORDERS)])
+    return (red << 16) | (green << 8) | blue
 
 
 def _shorten_text(string: str, max_length: int = 100, split: bool = True) -> str:
@@ -82,46 +126,135 @@ def _shorten_text(string: str, max_length: int = 100, split: bool = True) -> str
     return string
 
 
+def _render_page(
+    base: Embed,
+    rows: Sequence[tuple[str, str]],
+    index: int,
+    pages: int,
+    style: Literal['description', 'fields'],
+) -> Embed:
+    embed = base.copy()
+
+    if style == 'description':
+        description: list[str] = []
+        for row in rows:
+            if row[0]:
+                description.append(f'**{row[0]}**')
+            if row[1]:
+                description.append(f'{row[1]}')
+        embed.description = '\n'.join(description)
+    elif style == 'fields':
+        for row in rows:
+            embed.add_field(name=row[0], value=row[1], inline=False)
+
+    if pages > 1:
+        footer = f'Page {index+1}/{pages}'
+        if base.footer.text:
+            footer += f' | {base.footer.text}'
+    else:
+        footer = base.footer.text
+
+    embed.set_footer(text=footer, icon_url=base.footer.icon_url)
+
+    return embed
+
+
+class Pages(Sequence[Embed]):
+    """Embed pages made from `(name, value)` rows, page is rendered only when it's accessed."""
+
+    def __init__(
+        self,
+        base: Embed,
+        rows: Sequence[tuple[str, str]],
+        style: Literal['description', 'fields'] = 'description',
+        max_page_items: int = 25,
+    ) -> None:
+        self.base = base
+        self.rows = rows
+        self.style: Literal['description', 'fields'] = style
+        self.max_page_items = max_page_items
+
+    def __len__(self) -> int:
+        return max(math.ceil(len(self.rows) / self.max_page_items), 1)
+
+    @overload
+    def __getitem__(self, index: int) -> Embed: ...
+
+    @overload
+    def __getitem__(self, index: slice) -> list[Embed]: ...
+
+    def __getitem__(self, index: int | slice) -> Embed | list[Embed]:
+        if isinstance(index, slice):
+            return [self.render(i) for i in range(len(self))[index]]
+
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Page index out of range.')
+
+        return self.render(index)
+
+    async def get(self, index: int) -> Embed:
+        return self[index]
+
+    def render(self, index: int) -> Embed:
+        rows = self.rows[index * self.max_page_items : (index + 1) * self.max_page_items]
+        return _render_page(self.base, rows, index, len(self), self.style)
+
+
+class AsyncPages(Generic[RowT, KeyT]):
+    """Embed pages which rows are fetched only when page is shown, `total` is number of rows.
+
+    Page is fetched after last row of previous page when it was shown before, otherwise by offset.
+    """
+
+    def __init__(
+        self,
+        base: Embed,
+        total: int,
+        fetch: PageFetcher[KeyT, RowT],
+        key: Callable[[RowT], KeyT],
+        row: Callable[[RowT], tuple[str, str]],
+        style: Literal['description', 'fields'] = 'description',
+        max_page_items: int = 25,
+    ) -> None:
+        self.base = base
+        self.total = total
+        self.fetch = fetch
+        self.key = key
+        self.row = row
+        self.style: Literal['description', 'fields'] = style
+        self.max_page_items = max_page_items
+
+        # Key of last row by page index.
+        self.keys: dict[int, KeyT] = {}
+
+    def __len__(self) -> int:
+        return max(math.ceil(self.total / self.max_page_items), 1)
+
+    async def get(self, index: int) -> Embed:
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError('Page index out of range.')
+
+        after = self.keys.get(index - 1)
+        offset = index * self.max_page_items if after is None else 0
+
+        items = await self.fetch(self.max_page_items, after, offset)
+        if items:
+            self.keys[index] = self.key(items[-1])
+
+        return _render_page(self.base, [self.row(i) for i in items], index, len(self), self.style)
+
+
 def _paginate(
     base: Embed,
     items: Sequence[tuple[str, str]],
     style: Literal['description', 'fields'] = 'description',
     max_page_items: int = 25,
-) -> list[Embed]:
-    embeds: list[Embed] = []
-
-    pages = max(math.ceil(len(items) / max_page_items), 1)
-    for i in range(pages):
-        embed = base.copy()
-
-        leftover_items = len(items) - i * max_page_items
-
-        if style == 'description':
-            description: list[str] = []
-            for row in range(max(min(leftover_items, max_page_items), 0)):
-                item = items[i * max_page_items + row]
-                if item[0]:
-                    description.append(f'**{item[0]}**')
-                if item[1]:
-                    description.append(f'{item[1]}')
-            embed.description = '\n'.join(description)
-        elif style == 'fields':
-            for row in range(max(min(leftover_items, max_page_items), 0)):
-                item = items[i * max_page_items + row]
-                embed.add_field(name=item[0], value=item[1], inline=False)
-
-        if pages > 1:
-            footer = f'Page {i+1}/{pages}'
-            if base.footer.text:
-                footer += f' | {base.footer.text}'
-        else:
-            footer = base.footer.text
-
-        embed.set_footer(text=footer, icon_url=base.footer.icon_url)
-
-        embeds.append(embed)
-
-    return embeds
+) -> Pages:
+    return Pages(base, items, style, max_page_items)
 
 
 def _strip_amount(amount: int | float) -> int | float:
@@ -152,7 +285,33 @@ def _drink_info(item: Drink, *, delimiter: str = '\n', prefix: str = '') -> str:
     )
 
 
+def _copy_embed_dict(data: dict[str, Any]) -> dict[str, Any]:
+    """Copies serialized embed deep enough that `Embed.from_dict` result can't modify original."""
+    out = dict(data)
+    for key, value in data.items():
+        if isinstance(value, dict):
+            out[key] = dict(cast(dict[str, Any], value))
+        elif isinstance(value, list):
+            out[key] = [dict(i) for i in cast(list[dict[str, Any]], value)]
+
+    return out
+
+
+def _cached_embed(key: EmbedCacheKey, build: Callable[[], Embed]) -> Embed:
+    data = embed_cache.get(key)
+    if data is None:
+        embed = build()
+        embed_cache.set(key, _copy_embed_dict(dict(embed.to_dict())))
+        return embed
+
+    return Embed.from_dict(_copy_embed_dict(data))
+
+
 def drink_embed(item: Drink, glass: Glass, ingredients: list[DrinkIngredient], full: bool = False) -> Embed:
+    return _cached_embed((ItemType.DRINK, item.id, full, None), lambda: _drink_embed(item, glass, ingredients, full))
+
+
+def _drink_embed(item: Drink, glass: Glass, ingredients: list[DrinkIngredient], full: bool) -> Embed:
     emoji = random_drink_emoji(item.name)
     embed = Embed(title=f'{emoji} {item.name}', color=_random_color(seed=item.name))
     embed.set_image(url=item.thumbnail)
@@ -177,6 +336,10 @@ def drink_embed(item: Drink, glass: Glass, ingredients: list[DrinkIngredient], f
 
 
 def glass_embed(item: Glass) -> Embed:
+    return _cached_embed((ItemType.GLASS, item.id, False, None), lambda: _glass_embed(item))
+
+
+def _glass_embed(item: Glass) -> Embed:
     embed = Embed(title=item.name, color=_random_color(seed=item.name))
     embed.set_footer(text=f'ID: {item.id}')
 
@@ -184,6 +347,10 @@ def glass_embed(item: Glass) -> Embed:
 
 
 def ingredient_embed(item: Ingredient, style: Literal['thumbnail', 'image'] = 'thumbnail', full: bool = False) -> Embed:
+    return _cached_embed((ItemType.INGREDIENT, item.id, full, style), lambda: _ingredient_embed(item, style, full))
+
+
+def _ingredient_embed(item: Ingredient, style: Literal['thumbnail', 'image'], full: bool) -> Embed:
     description = _shorten_text(item.description, 500) if item.description and not full else item.description
 
     emoji = random_fruit_emoji(item.name) if item.alcohol is False else random_drink_emoji(item.name)
@@ -211,47 +378,71 @@ def _base_inventory_embed(target: Member | User, type: str) -> Embed:
     return embed
 
 
-def drink_inventory_embed(target: Member | User, items: list[UserDrink]) -> list[Embed]:
+def _inventory_key(item: UserDrink | UserGlass | UserIngredient) -> InventoryKey:
+    return (item.amount, item.name, item.id)
+
+
+def _drink_inventory_row(item: UserDrink) -> tuple[str, str]:
+    amount = _strip_amount(item.amount)
+    value = _drink_info(item, prefix="> ")
+    return (f'x{amount} {item.name}', value)
+
+
+def drink_inventory_embed(
+    target: Member | User,
+    total: int,
+    fetch: PageFetcher[InventoryKey, UserDrink],
+) -> AsyncPages[UserDrink, InventoryKey]:
     base = _base_inventory_embed(target, 'drink')
     base.color = discord.Color.from_rgb(105, 8, 3)
 
-    rows: list[tuple[str, str]] = []
+    return AsyncPages(base, total, fetch, _inventory_key, _drink_inventory_row, style='fields', max_page_items=5)
 
-    for item in items:
-        amount = _strip_amount(item.amount)
-        value = _drink_info(item, prefix="> ")
-        rows.append((f'x{amount} {item.name}', value))
 
-    return _paginate(base, rows, style='fields', max_page_items=5)
+def _glass_inventory_row(item: UserGlass) -> tuple[str, str]:
+    return ('', f'- x{item.amount} {item.name} ({item.id})')
 
 
-def glass_inventory_embed(target: Member | User, items: list[UserGlass]) -> list[Embed]:
+def glass_inventory_embed(
+    target: Member | User,
+    total: int,
+    fetch: PageFetcher[InventoryKey, UserGlass],
+) -> AsyncPages[UserGlass, InventoryKey]:
     base = _base_inventory_embed(target, 'glass')
     base.color = discord.Color.from_rgb(22, 37, 148)
 
-    rows: list[tuple[str, str]] = []
-    for item in items:
-        rows.append(('', f'- x{item.amount} {item.name} ({item.id})'))
+    return AsyncPages(base, total, fetch, _inventory_key, _glass_inventory_row, max_page_items=10)
+
 
-    return _paginate(base, rows, max_page_items=10)
+def _ingredient_inventory_row(item: UserIngredient) -> tuple[str, str]:
+    amount = _strip_amount(item.amount)
+    # value = [f'ID: {item.id}', f'Type: {item.type}', f'Alcohol: {item.alcohol}']
 
+    return ('', f'- x{amount} {item.name} ({item.id})')  #'\n'.join(value)))
 
-def ingredient_inventory_embed(target: Member | User, items: list[UserIngredient]) -> list[Embed]:
+
+def ingredient_inventory_embed(
+    target: Member | User,
+    total: int,
+    fetch: PageFetcher[InventoryKey, UserIngredient],
+) -> AsyncPages[UserIngredient, InventoryKey]:
     base = _base_inventory_embed(target, 'ingredient')
     base.color = discord.Color.from_rgb(131, 11, 138)
 
-    rows: list[tuple[str, str]] = []
+    return AsyncPages(base, total, fetch, _inventory_key, _ingredient_inventory_row, max_page_items=10)
 
-    for item in items:
-        amount = _strip_amount(item.amount)
-        # value = [f'ID: {item.id}', f'Type: {item.type}', f'Alcohol: {item.alcohol}']
 
-        rows.append(('', f'- x{amount} {item.name} ({item.id})'))  #'\n'.join(value)))
+def _missing_info(item: CraftCandidate) -> str:
+    missing: list[str] = []
+    if item.missing_ingredients:
+        missing.append(f'{item.missing_ingredients} ingredient{"s" if item.missing_ingredients > 1 else ""}')
+    if not item.has_glass:
+        missing.append('glass')
 
-    return _paginate(base, rows, max_page_items=10)
+    return f'> Missing: {", ".join(missing)}'
 
 
-def available_crafts_embed(user: Member | User, items: list[Drink]) -> list[Embed]:
+def available_crafts_embed(user: Member | User, items: list[CraftCandidate]) -> Pages:
     embed = Embed(
         title='Available drinks to craft:',
         description='Use `/craft name` to craft drink from your ingredients.',
@@ -261,36 +452,79 @@ def available_crafts_embed(user: Member | User, items: list[Drink]) -> list[Embe
     embed.set_footer(text=f'ID: {user.id}')
 
     rows: list[tuple[str, str]] = []
-    for item in items:
-        value = _drink_info(item, prefix="> ")
-        rows.append((f'\u25aa {item.name}', value))
+    for item in sorted(items, key=lambda i: not i.craftable):
+        value = _drink_info(item.drink, prefix="> ")
+        if item.craftable:
+            rows.append((f'\u25aa {item.drink.name}', value))
+        else:
+            rows.append((f'\u25ab {item.drink.name}', f'{_missing_info(item)}\n{value}'))
 
     return _paginate(embed, rows, style='fields', max_page_items=5)
 
 
-def search_result_embed(items: list[Drink] | list[Ingredient], *, full: bool = False) -> list[Embed]:
+def _base_search_embed() -> Embed:
     emoji = Emojis.MAGNIFYING_GLASS
-    embed = Embed(
+    return Embed(
         title=f'{emoji} Search results:',
         color=discord.Color.from_rgb(18, 181, 105),
     )
 
-    rows: list[tuple[str, str]] = []
-    for item in items:
-        name = f'\u25aa {item.name}'
 
-        if isinstance(item, Drink) and full:
-            value = _drink_info(item, prefix="> ")
-        elif isinstance(item, Ingredient) and full:
-            value = _ingredient_info(item, prefix="> ")
-        else:
-            name += f' ({item.id})'
-            value = ''
+def _search_result_row(item: Drink | Ingredient, full: bool) -> tuple[str, str]:
+    name = f'\u25aa {item.name}'
+
+    if isinstance(item, Drink) and full:
+        value = _drink_info(item, prefix="> ")
+    elif isinstance(item, Ingredient) and full:
+        value = _ingredient_info(item, prefix="> ")
+    else:
+        name += f' ({item.id})'
+        value = ''
+
+    return (name, value)
 
-        rows.append((name, value))
+
+def search_result_embed(items: list[Drink] | list[Ingredient], *, full: bool = False) -> Pages:
+    rows = [_search_result_row(item, full) for item in items]
 
     style = 'fields' if full else 'description'
-    return _paginate(embed, rows, style=style, max_page_items=10 if not full else 5)
+    return _paginate(_base_search_embed(), rows, style=style, max_page_items=10 if not full else 5)
+
+
+def drink_search_embed(
+    total: int,
+    fetch: PageFetcher[tuple[str, int], Drink],
+    *,
+    full: bool = False,
+) -> AsyncPages[Drink, tuple[str, int]]:
+    return AsyncPages(
+        _base_search_embed(),
+        total,
+        fetch,
+        lambda item: (item.name, item.id),
+        lambda item: _search_result_row(item, full),
+        style='fields' if full else 'description',
+        max_page_items=10 if not full else 5,
+    )
+
+
+def roll_summary_embed(
+    user: Member | User,
+    items: list[tuple[ItemType, Drink | Glass | Ingredient, int, float]],
+) -> Pages:
+    """`items` are `(type, item, rolled amount, amount in inventory)` tuples."""
+    embed = Embed(
+        title=f'{Emojis.GAME_DIE} Roll results:',
+        color=discord.Color.from_rgb(66, 135, 245),
+    )
+    embed.set_author(name=user.name, icon_url=user.display_avatar)
+    embed.set_footer(text=f'ID: {user.id}')
+
+    rows: list[tuple[str, str]] = []
+    for type, item, count, amount in items:
+        rows.append(('', f'- {type.title()}: x{count} {item.name} ({item.id}), now x{_strip_amount(amount)}'))
+
+    return _paginate(embed, rows, max_page_items=20)
 
 
 def _trade_offer_field(inventory: UserInventory) -> str:
@@ -1,3 +1,5 @@
+import functools
+import hashlib
 import random
 from enum import StrEnum
 from typing import Optional
@@ -29,6 +31,10 @@ class DrinkEmojis(StrEnum):
     TROPICAL_DRINK = '\uD83C\uDF79'
 
 
+FRUIT_EMOJIS: tuple[str, ...] = tuple(FruitEmojis)
+DRINK_EMOJIS: tuple[str, ...] = tuple(DrinkEmojis)
+
+
 class Emojis(StrEnum):
     ZERO_WIDTH_SPACE = '\u200B'
 
@@ -42,13 +48,30 @@ class Emojis(StrEnum):
     CROSS_MARK = '\u274C'
     CHECK_MARK = '\u2705'
     HANDSHAKE = '\uD83E\uDD1D'
+    GAME_DIE = '\uD83C\uDFB2'
 
 
 def random_fruit_emoji(seed: Optional[str] = None) -> str:
-    random.seed(seed)
-    return random.choice(list(FruitEmojis))
+    """Returns random fruit emoji, same `seed` always gives same emoji."""
+    if seed is None:
+        return random.choice(FRUIT_EMOJIS)
+
+    return _seeded_emoji(seed, FRUIT_EMOJIS)
 
 
 def random_drink_emoji(seed: Optional[str] = None) -> str:
-    random.seed(seed)
-    return random.choice(list(DrinkEmojis))
+    """Returns random drink emoji, same `seed` always gives same emoji."""
+    if seed is None:
+        return random.choice(DRINK_EMOJIS)
+
+    return _seeded_emoji(seed, DRINK_EMOJIS)
+
+
+def stable_hash(string: str) -> int:
+    """Returns 64-bit hash of `string` that, unlike `hash`, is same between runs."""
+    return int.from_bytes(hashlib.blake2b(string.encode(), digest_size=8).digest(), 'big')
+
+
+@functools.lru_cache(maxsize=4096)
+def _seeded_emoji(seed: str, emojis: tuple[str, ...]) -> str:
+    return emojis[stable_hash(seed) % len(emojis)]
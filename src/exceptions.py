@@ -16,3 +16,10 @@ class MissingGlassError(BotException):
 
 class MissingIngredientError(BotException):
     __qualname__ = f'Missing following ingredients'
+
+
+class NotEnoughItemsError(BotException):
+    def __init__(self, user_id: int, item_name: str) -> None:
+        super().__init__(f'User {user_id} doesn\'t have enough of {item_name}.')
+        self.user_id = user_id
+        self.item_name = item_name
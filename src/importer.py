@@ -0,0 +1,189 @@
+"""Imports drinks, ingredients and glasses from TheCocktailDB JSON dumps into bot database.
+
+Usage: `python importer.py --ingredients ingredients.json --drinks drinks.json`, where files are API responses like
+`{"ingredients": [...]}` and `{"drinks": [...]}`. Ingredients should be imported before or together with drinks,
+ingredients of drinks that aren't in database are skipped.
+"""
+
+import argparse
+import asyncio
+import time
+from collections import Counter
+from pathlib import Path
+from sqlite3 import PARSE_DECLTYPES
+from typing import Iterable, Optional
+
+import aiosqlite
+
+from cocktaildb import DrinkRecord, IngredientRecord, iter_json_array, parse_drink, parse_ingredient
+from database import Database
+from database.catalog import Catalog
+from database.models import Drink, Ingredient
+
+# fmt: off
+__all__ = (
+    'Importer',
+)
+# fmt: on
+
+DB_PATH = Path(__file__).parent / 'database.sqlite'  # Same as `config.DB_PATH`, config requires bot token.
+CHUNK_ROWS = 500
+
+IMPORT_PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+}
+
+
+class Importer:
+    """Writes catalog records in chunks of `chunk_rows` rows with `executemany`, counts written and skipped rows.
+
+    Should be used inside transaction, `catalog` has to be loaded as glasses and ingredients are matched by its names.
+    """
+
+    def __init__(self, database: Database, catalog: Catalog, chunk_rows: int = CHUNK_ROWS) -> None:
+        self.database = database
+        self.catalog = catalog
+        self.chunk_rows = chunk_rows
+
+        # Lowercase name to ID, names are case-insensitive in database.
+        self.glass_ids = {i.name.lower(): i.id for i in catalog.glasses.values()}
+        self.ingredient_ids = {i.name.lower(): i.id for i in catalog.ingredients.values()}
+
+        self.rows: Counter[str] = Counter()
+        self.skipped: Counter[str] = Counter()
+
+    async def import_ingredients(self, path: Path) -> None:
+        with open(path, encoding='utf-8') as file:
+            await self.write_ingredients(parse_ingredient(data) for data in iter_json_array(file))
+
+    async def import_drinks(self, path: Path) -> None:
+        with open(path, encoding='utf-8') as file:
+            await self.write_drinks(parse_drink(data) for data in iter_json_array(file))
+
+    async def write_ingredients(self, records: Iterable[IngredientRecord]) -> None:
+        chunk: list[Ingredient] = []
+
+        for record in records:
+            self.ingredient_ids[record.name.lower()] = record.id
+            chunk.append(Ingredient(*record))
+
+            if len(chunk) >= self.chunk_rows:
+                await self._write_ingredients(chunk)
+                chunk = []
+
+        await self._write_ingredients(chunk)
+
+    async def _write_ingredients(self, chunk: list[Ingredient]) -> None:
+        if chunk:
+            await self.database.upsert_ingredients(chunk)
+            self.rows['ingredients'] += len(chunk)
+
+    async def write_drinks(self, records: Iterable[DrinkRecord], replace_links: bool = False) -> None:
+        """Writes drinks with their ingredients, if `replace_links` ingredients drinks no longer have are removed."""
+        drinks: list[Drink] = []
+        links: list[tuple[int, int, Optional[str]]] = []
+
+        for record in records:
+            drink = await self._drink(record)
+            if drink is None:
+                self.skipped['drinks'] += 1
+                continue
+            drinks.append(drink)
+
+            for name, measure in record.ingredients:
+                ingredient_id = self.ingredient_ids.get(name.lower())
+                if ingredient_id is None:
+                    self.skipped['drink_ingredients'] += 1
+                else:
+                    links.append((record.id, ingredient_id, measure))
+
+            if len(drinks) >= self.chunk_rows:
+                await self._write_drinks(drinks, links, replace_links)
+                drinks, links = [], []
+
+        await self._write_drinks(drinks, links, replace_links)
+
+    async def _drink(self, record: DrinkRecord) -> Drink | None:
+        # Drink model requires both, TheCocktailDB drinks always have them.
+        if record.glass is None or record.thumbnail is None:
+            return None
+
+        glass_id = self.glass_ids.get(record.glass.lower())
+        if glass_id is None:
+            glass = await self.database.insert_glass(record.glass)
+            glass_id = self.glass_ids[record.glass.lower()] = glass.id
+            self.rows['glasses'] += 1
+
+        return Drink(
+            record.id,
+            record.name,
+            record.name_alternate,
+            record.tags,
+            record.category,
+            record.alcoholic,
+            glass_id,
+            record.instructions,
+            record.thumbnail,
+        )
+
+    async def _write_drinks(
+        self,
+        drinks: list[Drink],
+        links: list[tuple[int, int, Optional[str]]],
+        replace_links: bool,
+    ) -> None:
+        # Drinks go first, links reference them with foreign key.
+        if drinks:
+            await self.database.upsert_drinks(drinks)
+            self.rows['drinks'] += len(drinks)
+        if links:
+            await self.database.upsert_drink_ingredients(links)
+            self.rows['drink_ingredients'] += len(links)
+
+        if replace_links:
+            kept = {(drink_id, ingredient_id) for drink_id, ingredient_id, _ in links}
+            for drink in drinks:
+                for ingredient in self.catalog.drink_ingredients.get(drink.id, ()):
+                    if (drink.id, ingredient.id) not in kept:
+                        await self.database.remove_drink_ingredient(drink.id, ingredient.id)
+                        self.rows['removed_drink_ingredients'] += 1
+
+
+async def main():
+    parser = argparse.ArgumentParser(description='Import TheCocktailDB JSON dumps into bot database.')
+    parser.add_argument('--ingredients', type=Path, help='JSON file with `ingredients` array.')
+    parser.add_argument('--drinks', type=Path, help='JSON file with `drinks` array.')
+    parser.add_argument('--db', type=Path, default=DB_PATH, help='Database file, defaults to bot one.')
+    parser.add_argument('--chunk', type=int, default=CHUNK_ROWS, help='Rows written per `executemany`.')
+    args = parser.parse_args()
+
+    if not args.ingredients and not args.drinks:
+        parser.error('At least one of --ingredients or --drinks is required.')
+
+    async with aiosqlite.connect(args.db, detect_types=PARSE_DECLTYPES) as connection:
+        database = Database(connection, IMPORT_PRAGMAS)
+        await database.init()
+
+        importer = Importer(database, await database.get_catalog(), args.chunk)
+        start = time.perf_counter()
+
+        async with database, database.deferred_indexes():
+            if args.ingredients:
+                await importer.import_ingredients(args.ingredients)
+            if args.drinks:
+                await importer.import_drinks(args.drinks)
+
+        elapsed = time.perf_counter() - start
+
+    total = sum(importer.rows.values())
+    for table, rows in importer.rows.items():
+        print(f'{table}: {rows} rows')
+    for table, rows in importer.skipped.items():
+        print(f'{table}: {rows} skipped')
+    print(f'Imported {total} rows in {elapsed:.2f}s ({total / elapsed:.0f} rows/s).')
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,174 @@
+import json
+import logging
+import logging.handlers
+import queue
+import random
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Mapping, cast
+
+# fmt: off
+__all__ = (
+    'JsonFormatter',
+    'LazyQueueHandler',
+    'LogListener',
+    'SamplingFilter',
+    'parse_sample_rates',
+    'setup_logging',
+)
+# fmt: on
+
+# Attributes every `LogRecord` has, others were passed with `extra=` and are written as fields of JSON record.
+RECORD_ATTRIBUTES = frozenset(logging.makeLogRecord({}).__dict__) | {'message', 'asctime', 'taskName'}
+
+
+class JsonFormatter(logging.Formatter):
+    """Formats records as single line JSON objects with `time`, `level`, `logger`, `message` and `extra=` fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        data: dict[str, Any] = {
+            'time': datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        data.update((key, value) for key, value in record.__dict__.items() if key not in RECORD_ATTRIBUTES)
+
+        if record.exc_info:
+            data['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            data['exception'] = record.exc_text
+        if record.stack_info:
+            data['stack'] = self.formatStack(record.stack_info)
+
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """Passes only `rate` fraction of records below WARNING from loggers in `rates`, by name or name of parent.
+
+    Warnings and errors are always passed.
+    """
+
+    def __init__(self, rates: Mapping[str, float]) -> None:
+        super().__init__()
+        self.rates = dict(rates)
+
+    def _rate(self, name: str) -> float:
+        while True:
+            rate = self.rates.get(name)
+            if rate is not None:
+                return rate
+            if '.' not in name:
+                return 1.0
+            name = name.rpartition('.')[0]
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING or not self.rates:
+            return True
+
+        rate = self._rate(record.name)
+        return rate >= 1 or random.random() < rate
+
+
+class LazyQueueHandler(logging.handlers.QueueHandler):
+    """Puts records to bounded queue without formatting them, `QueueListener` thread formats and writes them.
+
+    Unlike `QueueHandler`, message isn't merged with its arguments in `prepare`, so logging call on event loop only
+    creates record. Arguments must not be changed after logging call. If queue is full, record is dropped and counted
+    in `dropped`, count of dropped records is logged as warning once queue has room again.
+    """
+
+    def __init__(self, queue_: 'queue.Queue[logging.LogRecord]') -> None:
+        super().__init__(queue_)
+        self.dropped = 0
+        self.unreported = 0
+        self.dropped_lock = threading.Lock()  # Records can be logged from threads too.
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with self.dropped_lock:
+                self.dropped += 1
+                self.unreported += 1
+            return
+
+        if self.unreported:
+            with self.dropped_lock:
+                unreported, self.unreported = self.unreported, 0
+
+            report = logging.makeLogRecord(
+                {
+                    'name': __name__,
+                    'levelno': logging.WARNING,
+                    'levelname': 'WARNING',
+                    'msg': 'Dropped %d log records, queue was full.',
+                    'args': (unreported,),
+                    'dropped': unreported,
+                }
+            )
+            try:
+                self.queue.put_nowait(report)
+            except queue.Full:
+                with self.dropped_lock:
+                    self.unreported += unreported
+
+
+class LogListener(logging.handlers.QueueListener):
+    """`QueueListener` that waits for room in bounded queue on `stop`, instead of failing if it's full."""
+
+    def __init__(self, queue_: 'queue.Queue[Any]', *handlers: logging.Handler, respect_handler_level: bool = False):
+        super().__init__(queue_, *handlers, respect_handler_level=respect_handler_level)
+        self.bounded_queue = queue_
+
+    def enqueue_sentinel(self) -> None:
+        self.bounded_queue.put(cast(Any, self)._sentinel)
+
+
+def parse_sample_rates(value: str) -> dict[str, float]:
+    """Parses `logger=rate` pairs separated by commas, like `cogs.drinks=0.1,cogs.inventory=0.5`."""
+    rates: dict[str, float] = {}
+    for pair in value.split(','):
+        if pair.strip():
+            name, _, rate = pair.partition('=')
+            rates[name.strip()] = float(rate)
+
+    return rates
+
+
+def setup_logging(
+    path: Path,
+    *,
+    level: int = logging.INFO,
+    queue_size: int = 10000,
+    sample_rates: Mapping[str, float] | None = None,
+) -> tuple[LazyQueueHandler, LogListener]:
+    """Sends records of root logger through `LazyQueueHandler` to rotating JSON lines file at `path`.
+
+    Returned listener is already started, it should be stopped on exit so queued records are written.
+    """
+    file_handler = logging.handlers.RotatingFileHandler(
+        filename=path,
+        encoding='utf-8',
+        maxBytes=5 * 1024 * 1024,  # 5 MiB
+        backupCount=5,
+    )
+    file_handler.setFormatter(JsonFormatter())
+
+    records: queue.Queue[logging.LogRecord] = queue.Queue(queue_size)
+    handler = LazyQueueHandler(records)
+    handler.addFilter(SamplingFilter(sample_rates or {}))
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(handler)
+
+    listener = LogListener(records, file_handler, respect_handler_level=True)
+    listener.start()
+
+    return handler, listener
@@ -1,27 +1,47 @@
 import asyncio
+import contextlib
 import logging
-import logging.handlers
 import os
 from pathlib import Path
 from sqlite3 import PARSE_DECLTYPES
-from typing import Any
+from typing import Any, Sequence
 
 import aiosqlite
 import discord
-from aiohttp import ClientSession, CookieJar
+from aiohttp import AsyncResolver, ClientSession, CookieJar, TCPConnector
 from discord.ext import commands
 
 import config
 from database import Database
+from embeds import embed_cache
+from logs import setup_logging
+from metrics import metrics
 
 logger = logging.getLogger(__name__)
 
 
 class CustomBot(commands.Bot):
-    def __init__(self, *args: Any, web_session: ClientSession, db_connection: aiosqlite.Connection, **kwargs: Any):
+    def __init__(
+        self,
+        *args: Any,
+        web_session: ClientSession,
+        db_connection: aiosqlite.Connection,
+        db_readers: Sequence[aiosqlite.Connection] = (),
+        **kwargs: Any,
+    ):
         super().__init__(*args, **kwargs)
         self.web_session = web_session
-        self.database = Database(db_connection)
+        self.database = Database(
+            db_connection,
+            config.SQLITE_PRAGMAS,
+            db_readers,
+            slow_query_threshold=config.SLOW_QUERY_MS / 1000 or None,
+            slow_query_sample=config.SLOW_QUERY_SAMPLE,
+        )
+        self.database.catalog.listeners.append(embed_cache.clear)
+
+        metrics.gauges['embed_cache_hit_rate'] = lambda: embed_cache.hit_rate
+        metrics.gauges['inventory_cache_hit_rate'] = lambda: self.database.inventory_cache.hit_rate
 
     async def setup_hook(self) -> None:
         for file in os.listdir(Path(__file__).parent / Path('cogs')):
@@ -41,33 +61,39 @@ async def main():
     logging.getLogger('discord').setLevel(logging.INFO)
     logging.getLogger('discord.http').setLevel(logging.INFO)
 
-    handler = logging.handlers.RotatingFileHandler(
-        filename='discord.log',
-        encoding='utf-8',
-        maxBytes=5 * 1024 * 1024,  # 5 MiB
-        backupCount=5,
+    # Records are written to file by listener thread, so logging on event loop doesn't wait for disk.
+    log_handler, log_listener = setup_logging(
+        config.LOG_PATH,
+        queue_size=config.LOG_QUEUE_SIZE,
+        sample_rates=config.LOG_SAMPLE_RATES,
     )
-    dt_fmt = '%Y-%m-%d %H:%M:%S'
-    log_fmt = '[{asctime}] [{levelname:<8}] {name}: {message}'
-    formatter = logging.Formatter(log_fmt, dt_fmt, style='{')
-    handler.setFormatter(formatter)
-
-    logging.basicConfig(format=log_fmt, datefmt=dt_fmt, style='{', handlers=[handler], level=logging.INFO)
+    metrics.gauges['log_records_dropped'] = lambda: log_handler.dropped
 
     cookies = CookieJar()
-
-    async with (
-        ClientSession(cookie_jar=cookies) as web_session,
-        aiosqlite.connect(config.DB_PATH, detect_types=PARSE_DECLTYPES) as db_connection,
-    ):
-        async with CustomBot(
-            command_prefix='!',
-            intents=intents,
-            help_command=None,
-            web_session=web_session,
-            db_connection=db_connection,
-        ) as bot:
-            await bot.start(config.TOKEN)
+    connector = TCPConnector(resolver=AsyncResolver(), limit_per_host=config.SYNC_CONNECTIONS_PER_HOST)
+
+    try:
+        async with (
+            ClientSession(cookie_jar=cookies, connector=connector) as web_session,
+            aiosqlite.connect(config.DB_PATH, detect_types=PARSE_DECLTYPES) as db_connection,
+            contextlib.AsyncExitStack() as stack,
+        ):
+            db_readers = [
+                await stack.enter_async_context(aiosqlite.connect(config.DB_PATH, detect_types=PARSE_DECLTYPES))
+                for _ in range(config.DB_READERS)
+            ]
+
+            async with CustomBot(
+                command_prefix='!',
+                intents=intents,
+                help_command=None,
+                web_session=web_session,
+                db_connection=db_connection,
+                db_readers=db_readers,
+            ) as bot:
+                await bot.start(config.TOKEN)
+    finally:
+        log_listener.stop()  # Writes records still in queue.
 
 
 if __name__ == "__main__":
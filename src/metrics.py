@@ -0,0 +1,217 @@
+import bisect
+import functools
+import itertools
+import re
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Callable, Iterable, Optional, Sequence
+
+# fmt: off
+__all__ = (
+    'Histogram',
+    'Metrics',
+    'SlowQuery',
+    'metrics',
+    'normalize_sql',
+    'param_shape',
+)
+# fmt: on
+
+# Upper bounds of histogram buckets in seconds.
+BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+_LITERAL_REGEXP = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+_PLACEHOLDERS_REGEXP = re.compile(r'\?(?:\s*,\s*\?)+')
+_ROWS_REGEXP = re.compile(r'\(\?\)(?:\s*,\s*\(\?\))+')
+
+
+@functools.lru_cache(maxsize=1024)
+def normalize_sql(query: str) -> str:
+    """Returns `query` with literals and lists of placeholders replaced by single `?` and collapsed whitespace.
+
+    Queries that differ only in parameters or in number of them get same shape.
+    """
+    query = _LITERAL_REGEXP.sub('?', query)
+    query = _PLACEHOLDERS_REGEXP.sub('?', query)
+    query = _ROWS_REGEXP.sub('(?)', query)
+    return ' '.join(query.split())
+
+
+def param_shape(params: Optional[Iterable[Any]]) -> str:
+    """Returns types of query parameters with runs of same type collapsed, like `(int, str, int*50)`."""
+    if params is None:
+        return '()'
+
+    runs = ((name, len(list(group))) for name, group in itertools.groupby(type(i).__name__ for i in params))
+    return f'({", ".join(name if count == 1 else f"{name}*{count}" for name, count in runs)})'
+
+
+class Histogram:
+    """Counts of observed values by bucket like Prometheus histogram, quantiles are upper bounds of their buckets."""
+
+    def __init__(self, buckets: Sequence[float] = BUCKETS) -> None:
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last one is for values over highest bound.
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    @property
+    def mean(self) -> float:
+        return self.sum / self.count if self.count else 0.0
+
+    def quantile(self, q: float) -> float:
+        rank = q * self.count
+        total = 0
+        for bound, count in zip(self.buckets, self.counts):
+            total += count
+            if total >= rank:
+                return bound
+
+        return float('inf')
+
+    def cumulative(self) -> Iterable[tuple[str, int]]:
+        """Yields `(le label, count of values less or equal)` pairs, last one is `+Inf`."""
+        total = 0
+        for bound, count in zip((*self.buckets, float('inf')), self.counts):
+            total += count
+            yield ('+Inf' if bound == float('inf') else f'{bound:g}', total)
+
+
+@dataclass(slots=True)
+class SlowQuery:
+    """Executions of query shape that took longer than threshold, with details of slowest one."""
+
+    query: str
+    count: int = 0
+    total: float = 0.0
+    max: float = 0.0
+    params: str = ''  # Parameter shape of slowest execution.
+    plan: list[str] = field(default_factory=list)  # Last sampled `EXPLAIN QUERY PLAN`, indented by depth.
+
+
+def _label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+class Metrics:
+    """Latencies of commands by phase and of database queries by their normalized shape."""
+
+    def __init__(self) -> None:
+        self.commands: defaultdict[tuple[str, str], Histogram] = defaultdict(Histogram)
+        self.command_errors: Counter[str] = Counter()
+
+        self.queries: defaultdict[str, Histogram] = defaultdict(Histogram)
+        self.query_rows: Counter[str] = Counter()
+        self.slow_queries: dict[str, SlowQuery] = {}
+
+        # Values read on export, like hit rates of caches.
+        self.gauges: dict[str, Callable[[], float]] = {}
+
+    def observe_command(self, command: str, phase: str, seconds: float) -> None:
+        self.commands[(command, phase)].observe(seconds)
+
+    def observe_query(self, query: str, seconds: float, rows: int) -> None:
+        shape = normalize_sql(query)
+        self.queries[shape].observe(seconds)
+        self.query_rows[shape] += rows
+
+    def observe_slow_query(self, query: str, seconds: float, params: Optional[Iterable[Any]]) -> SlowQuery:
+        shape = normalize_sql(query)
+        slow = self.slow_queries.get(shape)
+        if slow is None:
+            slow = self.slow_queries[shape] = SlowQuery(shape)
+
+        slow.count += 1
+        slow.total += seconds
+        if seconds >= slow.max:
+            slow.max = seconds
+            slow.params = param_shape(params)
+
+        return slow
+
+    def clear(self) -> None:
+        self.commands.clear()
+        self.command_errors.clear()
+        self.queries.clear()
+        self.query_rows.clear()
+        self.slow_queries.clear()
+
+    def prometheus(self, prefix: str = 'bartender') -> str:
+        """Returns metrics in Prometheus text exposition format."""
+        lines: list[str] = []
+
+        lines.append(f'# TYPE {prefix}_command_seconds histogram')
+        for (command, phase), histogram in sorted(self.commands.items()):
+            labels = f'command="{_label(command)}",phase="{phase}"'
+            for le, count in histogram.cumulative():
+                lines.append(f'{prefix}_command_seconds_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f'{prefix}_command_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+            lines.append(f'{prefix}_command_seconds_count{{{labels}}} {histogram.count}')
+
+        lines.append(f'# TYPE {prefix}_command_errors_total counter')
+        for command, count in sorted(self.command_errors.items()):
+            lines.append(f'{prefix}_command_errors_total{{command="{_label(command)}"}} {count}')
+
+        lines.append(f'# TYPE {prefix}_query_seconds histogram')
+        for query, histogram in sorted(self.queries.items()):
+            labels = f'query="{_label(query)}"'
+            for le, count in histogram.cumulative():
+                lines.append(f'{prefix}_query_seconds_bucket{{{labels},le="{le}"}} {count}')
+            lines.append(f'{prefix}_query_seconds_sum{{{labels}}} {histogram.sum:.6f}')
+            lines.append(f'{prefix}_query_seconds_count{{{labels}}} {histogram.count}')
+
+        lines.append(f'# TYPE {prefix}_query_rows_total counter')
+        for query, rows in sorted(self.query_rows.items()):
+            lines.append(f'{prefix}_query_rows_total{{query="{_label(query)}"}} {rows}')
+
+        for name, gauge in sorted(self.gauges.items()):
+            lines.append(f'# TYPE {prefix}_{name} gauge')
+            lines.append(f'{prefix}_{name} {gauge():g}')
+
+        return '\n'.join(lines) + '\n'
+
+    def summary(self, limit: int = 10, query_length: int = 80) -> str:
+        """Returns text table of slowest commands and queries by total time, for `!stats` command."""
+        lines = ['Commands (count, mean ms, p95 ms):']
+        for (command, phase), histogram in sorted(self.commands.items(), key=lambda i: -i[1].sum)[:limit]:
+            lines.append(
+                f'  {command} {phase}: {histogram.count}, {histogram.mean * 1000:.1f}, {histogram.quantile(0.95) * 1000:g}'
+                + (
+                    f' ({self.command_errors[command]} errors)'
+                    if phase == 'handler' and self.command_errors[command]
+                    else ''
+                )
+            )
+
+        lines.append('Queries (count, mean ms, p95 ms, rows):')
+        for query, histogram in sorted(self.queries.items(), key=lambda i: -i[1].sum)[:limit]:
+            shape = query if len(query) <= query_length else query[: query_length - 3] + '...'
+            lines.append(
+                f'  {shape}: {histogram.count}, {histogram.mean * 1000:.2f}, '
+                f'{histogram.quantile(0.95) * 1000:g}, {self.query_rows[query]}'
+            )
+
+        for name, gauge in sorted(self.gauges.items()):
+            lines.append(f'{name}: {gauge():.3f}')
+
+        return '\n'.join(lines)
+
+    def slowest(self, limit: int = 5, query_length: int = 300) -> str:
+        """Returns slowest query shapes by max duration with their plans, for `!slowqueries` command."""
+        lines: list[str] = []
+        for slow in sorted(self.slow_queries.values(), key=lambda i: -i.max)[:limit]:
+            query = slow.query if len(slow.query) <= query_length else slow.query[: query_length - 3] + '...'
+            lines.append(f'{slow.max * 1000:.1f} ms max, {slow.total / slow.count * 1000:.1f} ms mean, {slow.count}x')
+            lines.append(f'  {query}')
+            lines.append(f'  params: {slow.params}')
+            lines.extend(f'  {i}' for i in slow.plan)
+
+        return '\n'.join(lines) or 'No slow queries.'
+
+
+metrics = Metrics()
@@ -0,0 +1,301 @@
+import asyncio
+import hashlib
+import json
+import logging
+import random
+import time
+from collections import Counter
+from pathlib import Path
+from typing import Any, Iterable, NamedTuple, Optional
+
+import aiohttp
+from yarl import URL
+
+from cocktaildb import DrinkRecord, IngredientRecord, parse_drink, parse_ingredient
+from database import Database
+from database.catalog import Catalog
+from importer import Importer
+from typedefs import ItemType
+
+# fmt: off
+__all__ = (
+    'CatalogSync',
+    'ResponseCache',
+)
+# fmt: on
+
+logger = logging.getLogger(__name__)
+
+# Path and query parameter of detail lookup by ID, response has `drinks` or `ingredients` array.
+LOOKUP_PARAMS = {
+    ItemType.DRINK: ('lookup.php', 'i', 'drinks'),
+    ItemType.INGREDIENT: ('lookup.php', 'iid', 'ingredients'),
+}
+
+RETRY_STATUSES = frozenset((429, 500, 502, 503, 504))
+
+
+class CachedResponse(NamedTuple):
+    etag: str | None
+    last_modified: str | None
+    body: str
+
+
+class RetryError(Exception):
+    """Response that should be requested again, after `delay` seconds if server asked for it."""
+
+    def __init__(self, status: int, delay: Optional[float]) -> None:
+        super().__init__(f'Server responded with {status}.')
+        self.delay = delay
+
+
+class ResponseCache:
+    """Stores response bodies with their `ETag` and `Last-Modified` on disk, one JSON file per URL."""
+
+    def __init__(self, path: Path) -> None:
+        self.path = path
+
+    def _file(self, url: URL) -> Path:
+        return self.path / f'{hashlib.sha256(str(url).encode()).hexdigest()}.json'
+
+    def _read(self, url: URL) -> CachedResponse | None:
+        try:
+            with open(self._file(url), encoding='utf-8') as file:
+                return CachedResponse(*json.load(file))
+        except (OSError, ValueError, TypeError):
+            return None
+
+    def _write(self, url: URL, response: CachedResponse) -> None:
+        self.path.mkdir(parents=True, exist_ok=True)
+
+        # Written to temporary file first, so interrupted write doesn't leave broken entry.
+        file = self._file(url)
+        temporary = file.with_suffix('.tmp')
+        temporary.write_text(json.dumps(response), encoding='utf-8')
+        temporary.replace(file)
+
+    async def get(self, url: URL) -> CachedResponse | None:
+        return await asyncio.to_thread(self._read, url)
+
+    async def set(self, url: URL, response: CachedResponse) -> None:
+        await asyncio.to_thread(self._write, url, response)
+
+
+class CatalogSync:
+    """Fetches drink and ingredient details from TheCocktailDB API and upserts ones that changed.
+
+    Requests are made by `workers` concurrent workers, at most `rate` per second, with conditional headers from
+    on-disk cache, so unchanged items cost only `304 Not Modified` response without body. Failed requests are retried
+    `retries` times with exponential backoff.
+    """
+
+    def __init__(
+        self,
+        session: aiohttp.ClientSession,
+        database: Database,
+        base_url: str,
+        cache_path: Path,
+        *,
+        workers: int = 4,
+        rate: float = 10,
+        retries: int = 3,
+        backoff: float = 1,
+    ) -> None:
+        self.session = session
+        self.database = database
+        self.base_url = URL(base_url)
+        self.cache = ResponseCache(cache_path)
+
+        self.workers = workers
+        self.rate = rate
+        self.retries = retries
+        self.backoff = backoff
+
+        self.rate_lock = asyncio.Lock()
+        self.next_request = 0.0
+
+        self.stats: Counter[str] = Counter()
+
+    async def _throttle(self) -> None:
+        async with self.rate_lock:
+            now = time.monotonic()
+            if self.next_request > now:
+                await asyncio.sleep(self.next_request - now)
+                now = self.next_request
+
+            self.next_request = now + 1 / self.rate
+
+    def _retry_delay(self, attempt: int, error: Exception) -> float:
+        if isinstance(error, RetryError) and error.delay is not None:
+            return error.delay
+
+        return self.backoff * 2**attempt * (1 + random.random())
+
+    async def _request(self, url: URL, cached: CachedResponse | None) -> CachedResponse | None:
+        """Returns new response, or None if cached one is still valid."""
+        headers: dict[str, str] = {}
+        if cached and cached.etag:
+            headers['If-None-Match'] = cached.etag
+        if cached and cached.last_modified:
+            headers['If-Modified-Since'] = cached.last_modified
+
+        await self._throttle()
+
+        async with self.session.get(url, headers=headers) as response:
+            if response.status == 304 and cached:
+                return None
+
+            if response.status in RETRY_STATUSES:
+                retry_after = response.headers.get('Retry-After', '')
+                raise RetryError(response.status, float(retry_after) if retry_after.isdigit() else None)
+
+            response.raise_for_status()
+
+            return CachedResponse(
+                response.headers.get('ETag'),
+                response.headers.get('Last-Modified'),
+                await response.text(),
+            )
+
+    async def fetch(self, url: URL) -> tuple[Any, bool]:
+        """Returns decoded JSON of `url` and whether it was modified since it was cached."""
+        cached = await self.cache.get(url)
+
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._request(url, cached)
+            except (RetryError, aiohttp.ClientConnectionError, asyncio.TimeoutError) as error:
+                if attempt == self.retries:
+                    raise
+
+                self.stats['retries'] += 1
+                await asyncio.sleep(self._retry_delay(attempt, error))
+                continue
+
+            if response is None:
+                assert cached
+                return json.loads(cached.body), False
+
+            await self.cache.set(url, response)
+            return json.loads(response.body), True
+
+        raise AssertionError('Unreachable.')
+
+    async def _fetch_item(self, type: ItemType, id: int) -> DrinkRecord | IngredientRecord | None:
+        path, parameter, key = LOOKUP_PARAMS[type]
+        data, modified = await self.fetch((self.base_url / path).with_query({parameter: id}))
+
+        # Not modified response is still compared with catalog, in case previous write of it failed.
+        if not modified:
+            self.stats['not_modified'] += 1
+
+        items = data.get(key)
+        if not items:
+            self.stats['not_found'] += 1
+            return None
+
+        return parse_drink(items[0]) if type == ItemType.DRINK else parse_ingredient(items[0])
+
+    async def _worker(
+        self,
+        queue: 'asyncio.Queue[tuple[ItemType, int]]',
+        changed: list[DrinkRecord | IngredientRecord],
+        catalog: Catalog,
+    ) -> None:
+        while True:
+            type, id = await queue.get()
+
+            try:
+                record = await self._fetch_item(type, id)
+                if record is not None:
+                    if _changed(record, catalog):
+                        changed.append(record)
+                    else:
+                        self.stats['unchanged'] += 1
+            except Exception as error:
+                self.stats['failed'] += 1
+                logger.warning('Failed to sync %s %s: %s: %s', type, id, error.__class__.__name__, error)
+            finally:
+                queue.task_done()
+
+    async def sync(self, items: Iterable[tuple[ItemType, int]]) -> Counter[str]:
+        """Syncs `(type, ID)` items, returns counts of requests outcomes and written rows."""
+        self.stats = Counter()
+        catalog = await self.database.get_catalog()
+
+        queue: asyncio.Queue[tuple[ItemType, int]] = asyncio.Queue()
+        for item in items:
+            queue.put_nowait(item)
+        self.stats['requested'] += queue.qsize()
+
+        changed: list[DrinkRecord | IngredientRecord] = []
+        workers = [asyncio.create_task(self._worker(queue, changed, catalog)) for _ in range(self.workers)]
+
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+
+        self.stats['changed'] += len(changed)
+        if changed:
+            await self._write(changed)
+
+        return self.stats
+
+    async def sync_catalog(self, types: Iterable[ItemType] = (ItemType.INGREDIENT, ItemType.DRINK)) -> Counter[str]:
+        """Syncs all items of `types` that are in catalog."""
+        catalog = await self.database.get_catalog()
+        return await self.sync((type, id) for type in types for id in catalog.items(type))
+
+    async def _write(self, records: list[DrinkRecord | IngredientRecord]) -> None:
+        async with self.database:
+            importer = Importer(self.database, await self.database.get_catalog())
+
+            # Ingredients go first, so drinks can link new ones.
+            await importer.write_ingredients(i for i in records if isinstance(i, IngredientRecord))
+            await importer.write_drinks((i for i in records if isinstance(i, DrinkRecord)), replace_links=True)
+
+        self.stats.update(importer.rows)
+
+
+def _changed(record: DrinkRecord | IngredientRecord, catalog: Catalog) -> bool:
+    if isinstance(record, IngredientRecord):
+        ingredient = catalog.ingredients.get(record.id)
+        return ingredient is None or tuple(record) != (
+            ingredient.id,
+            ingredient.name,
+            ingredient.description,
+            ingredient.type,
+            ingredient.alcohol,
+        )
+
+    drink = catalog.drinks.get(record.id)
+    if drink is None:
+        return True
+
+    glass = catalog.glasses.get(drink.glass)
+    ingredients = {(i.name.lower(), i.measure) for i in catalog.drink_ingredients.get(drink.id, ())}
+
+    return (
+        record.name,
+        record.name_alternate,
+        record.tags,
+        record.category,
+        record.alcoholic,
+        (record.glass or '').lower(),
+        record.instructions,
+        record.thumbnail,
+        {(name.lower(), measure) for name, measure in record.ingredients},
+    ) != (
+        drink.name,
+        drink.name_alternate,
+        drink.tags,
+        drink.category,
+        drink.alcoholic,
+        glass.name.lower() if glass else '',
+        drink.instructions,
+        drink.thumbnail,
+        ingredients,
+    )
@@ -1,31 +1,100 @@
 import functools
+import time
+from contextvars import ContextVar
 from logging import Logger
-from typing import Any, Callable, Sequence
+from typing import Any, Callable, Concatenate, Coroutine, Iterable, Literal, Optional, ParamSpec, Sequence, TypeVar, overload
 
 import discord
+from discord import app_commands
 from discord.ext import commands
+from discord.utils import MISSING
 
+from database.models import Drink, Glass, Ingredient
+from metrics import metrics
 from typedefs import KT, VT
 
+MAX_CHOICE_LENGTH = 100
+
+
+CogT = TypeVar('CogT', bound=commands.Cog)
+P = ParamSpec('P')
+
+CommandCallback = Callable[Concatenate[CogT, discord.Interaction, P], Coroutine[Any, Any, None]]
+
+# Durations of followups sent by `send_followup` during command, set by `cog_logging_wrapper` for its handler.
+followup_seconds: ContextVar[Optional[list[float]]] = ContextVar('followup_seconds', default=None)
+
+
+@overload
+async def send_followup(
+    interaction: discord.Interaction, content: str = MISSING, *, wait: Literal[True], **kwargs: Any
+) -> discord.WebhookMessage: ...
+
+
+@overload
+async def send_followup(
+    interaction: discord.Interaction, content: str = MISSING, *, wait: Literal[False] = False, **kwargs: Any
+) -> None: ...
+
+
+async def send_followup(
+    interaction: discord.Interaction, content: str = MISSING, *, wait: bool = False, **kwargs: Any
+) -> Optional[discord.WebhookMessage]:
+    """Sends `interaction` followup like `interaction.followup.send`, timing it for `followup` phase of command."""
+    start = time.perf_counter()
+    try:
+        if wait:
+            return await interaction.followup.send(content, wait=True, **kwargs)
+        await interaction.followup.send(content, **kwargs)
+    finally:
+        durations = followup_seconds.get()
+        if durations is not None:
+            durations.append(time.perf_counter() - start)
+
 
 def cog_logging_wrapper(*, logger: Logger, skip_errors: tuple[type[Exception], ...] = ()):
-    def decorator(func: Callable[..., Any]):
+    """Defers interaction, logs command usage and sends errors as followup.
+
+    Durations of defer, handler and followups are recorded in `metrics` by command name. Handler has to send its
+    followups with `send_followup`, their time is recorded as `followup` phase and not as part of handler duration.
+    """
+
+    def decorator(func: CommandCallback[CogT, P]) -> CommandCallback[CogT, P]:
         @functools.wraps(func)
-        async def wrapper(self: commands.Cog, interaction: discord.Interaction, *args: Any, **kwargs: Any):
+        async def wrapper(self: CogT, interaction: discord.Interaction, *args: P.args, **kwargs: P.kwargs) -> None:
             assert interaction.command
+            command = interaction.command.qualified_name
 
+            start = time.perf_counter()
             await interaction.response.defer()
+            deferred = time.perf_counter()
+            metrics.observe_command(command, 'defer', deferred - start)
 
             user = interaction.user
-            logger.info(f'{user.name}:{user.id} used {interaction.command.qualified_name} with {kwargs}')
+            logger.info('%s:%s used %s with %s', user.name, user.id, command, kwargs)
+
+            durations: list[float] = []
+            token = followup_seconds.set(durations)
             try:
-                await func(self, interaction, *args, **kwargs)
-            except skip_errors as error:
-                msg = f'{error.__class__.__qualname__}: {error}'
-                await interaction.followup.send(f'```{msg}```')
-            except Exception as error:
-                logger.exception(f'{error.__class__.__name__}: {error}')
-                await interaction.followup.send(f'```{error.__class__.__qualname__}: {error}```')
+                message = None
+                try:
+                    await func(self, interaction, *args, **kwargs)
+                except skip_errors as error:
+                    message = f'{error.__class__.__qualname__}: {error}'
+                except Exception as error:
+                    logger.exception('%s: %s', error.__class__.__name__, error)
+                    metrics.command_errors[command] += 1
+                    message = f'{error.__class__.__qualname__}: {error}'
+
+                metrics.observe_command(command, 'handler', time.perf_counter() - deferred - sum(durations))
+
+                if message is not None:
+                    await send_followup(interaction, f'```{message}```')
+            finally:
+                followup_seconds.reset(token)
+
+            if durations:
+                metrics.observe_command(command, 'followup', sum(durations))
 
         return wrapper
 
@@ -35,3 +104,34 @@ def cog_logging_wrapper(*, logger: Logger, skip_errors: tuple[type[Exception], .
 def reverse_dict(d: dict[KT, Sequence[VT]]) -> dict[VT, KT]:
     """Swaps dict `key` and `value` list to `value`:`key` for each `value` in `value` Sequence."""
     return {value: key for key, values in d.items() for value in values}
+
+
+def split_last(string: str, separator: str = ',') -> tuple[str, str]:
+    """Splits `string` into everything up to last `separator` segment and stripped last segment."""
+    last = string.rsplit(separator, 1)[-1].lstrip()
+    return string[: len(string) - len(last)], last
+
+
+def item_choices(
+    items: Iterable[Drink | Glass | Ingredient],
+    *,
+    prefix: str = '',
+    send_name: bool = False,
+) -> list[app_commands.Choice[str]]:
+    """Makes autocomplete choices that show item name and send item ID, both prefixed with `prefix`.
+
+    With `send_name` item name is sent instead, for parameters that are matched against names only.
+    """
+    choices: list[app_commands.Choice[str]] = []
+    for item in items:
+        value = f'{prefix}{item.name if send_name else item.id}'
+        if len(value) > MAX_CHOICE_LENGTH:
+            continue
+
+        name = f'{prefix}{item.name}'
+        if len(name) > MAX_CHOICE_LENGTH:
+            name = name[: MAX_CHOICE_LENGTH - 3] + '...'
+
+        choices.append(app_commands.Choice(name=name, value=value))
+
+    return choices
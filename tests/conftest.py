@@ -0,0 +1,80 @@
+import asyncio
+import contextlib
+import os
+from pathlib import Path
+from sqlite3 import PARSE_DECLTYPES
+from typing import AsyncIterator, Awaitable, Callable
+
+import aiosqlite
+import pytest
+
+from database import Database
+from database.models import Glass
+
+os.environ.setdefault('BOT_TOKEN', 'test')  # `config` requires it, cogs import `config`.
+
+PRAGMAS = {
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'foreign_keys': 'ON',
+}
+READERS = 2
+
+
+@contextlib.asynccontextmanager
+async def open_database(path: Path) -> AsyncIterator[Database]:
+    """Opens database file with writer and reader connections like bot does, schema is created and migrated."""
+    async with aiosqlite.connect(path, detect_types=PARSE_DECLTYPES) as connection, contextlib.AsyncExitStack() as stack:
+        readers = [
+            await stack.enter_async_context(aiosqlite.connect(path, detect_types=PARSE_DECLTYPES)) for _ in range(READERS)
+        ]
+
+        database = Database(connection, PRAGMAS, readers)
+        await database.init()
+        yield database
+
+
+async def seed(database: Database) -> tuple[Glass, Glass]:
+    """Adds small catalog: 2 glasses, ingredients 1-4 and drinks 10-12."""
+    async with database:
+        highball = await database.insert_glass('Highball glass')
+        cocktail = await database.insert_glass('Cocktail glass')
+
+        await database.insert_ingredient(1, 'Vodka', 'Clear spirit', 'Vodka', True)
+        await database.insert_ingredient(2, 'Orange juice', None, 'Juice', False)
+        await database.insert_ingredient(3, 'Lime', None, 'Fruit', False)
+        await database.insert_ingredient(4, 'Gin', None, 'Gin', True)
+
+        await database.insert_drink(10, 'Screwdriver', None, 'IBA', 'Cocktail', True, highball.id, 'Mix.', 'http://a')
+        await database.insert_drink(11, 'Gimlet', None, None, 'Cocktail', True, cocktail.id, 'Shake.', 'http://b')
+        await database.insert_drink(12, 'Vodka Gimlet', None, None, 'Cocktail', True, cocktail.id, 'Shake.', 'http://c')
+
+        for drink_id, ingredient_id, measure in [
+            (10, 1, '2 oz'),
+            (10, 2, None),
+            (11, 4, '2 oz'),
+            (11, 3, None),
+            (12, 1, None),
+            (12, 3, None),
+        ]:
+            await database.insert_drink_ingredient(drink_id, ingredient_id, measure)
+
+    return highball, cocktail
+
+
+DatabaseTest = Callable[[Database, tuple[Glass, Glass]], Awaitable[None]]
+
+
+@pytest.fixture
+def run_with_database(tmp_path: Path) -> Callable[[DatabaseTest], None]:
+    """Runs async test function with seeded database file and its glasses, each test gets own event loop."""
+
+    def run(test: DatabaseTest) -> None:
+        async def main() -> None:
+            async with open_database(tmp_path / 'test.sqlite') as database:
+                glasses = await seed(database)
+                await test(database, glasses)
+
+        asyncio.run(main())
+
+    return run
@@ -0,0 +1,138 @@
+import asyncio
+
+from database import Database
+from database.models import Glass, UserSetItemSignature
+from exceptions import NotEnoughItemsError
+from typedefs import ItemType
+
+ROLLS = 300
+USER = 1
+TARGET = 2
+
+
+async def total_glasses(database: Database, glass: Glass) -> dict[int, float]:
+    rows = await database._fetchrows(
+        'SELECT user_id, amount FROM glass_inventory WHERE glass_id = ?;',
+        (glass.id,),
+        connection=database.connection,
+    )
+    return {user_id: amount for user_id, amount in rows}
+
+
+def test_concurrent_rolls_count_is_exact(run_with_database):
+    async def test(database: Database, glasses: tuple[Glass, Glass]) -> None:
+        async def roll() -> float:
+            # Same as `/roll`.
+            async with database:
+                await database.create_user(USER, 'user')
+                return await database.award_item(USER, ItemType.DRINK, 10)
+
+        amounts = await asyncio.gather(*(roll() for _ in range(ROLLS)))
+
+        assert sorted(amounts) == list(range(1, ROLLS + 1))
+        assert (await database.get_user_drinks(USER))[10].amount == ROLLS
+
+        database.inventory_cache.clear()
+        assert (await database.get_user_drinks(USER))[10].amount == ROLLS
+
+    run_with_database(test)
+
+
+def test_concurrent_add_user_items_under_user_lock(run_with_database):
+    async def test(database: Database, glasses: tuple[Glass, Glass]) -> None:
+        async def add(item_id: int) -> None:
+            async with database.lock_users(USER), database:
+                await database.create_user(USER, 'user')
+                await database.add_user_items(ItemType.INGREDIENT, UserSetItemSignature(USER, item_id, 1))
+
+        await asyncio.gather(*(add(i % 4 + 1) for i in range(ROLLS)))
+
+        database.inventory_cache.clear()
+        ingredients = await database.get_user_ingredients(USER)
+        assert {id: item.amount for id, item in ingredients.items()} == {i: ROLLS / 4 for i in range(1, 5)}
+        assert len(database.lock_users) == 0
+
+    run_with_database(test)
+
+
+def test_craft_after_trade_took_its_glass_rolls_back(run_with_database):
+    async def test(database: Database, glasses: tuple[Glass, Glass]) -> None:
+        highball, _ = glasses
+
+        async with database:
+            await database.create_user(USER, 'user')
+            await database.create_user(TARGET, 'target')
+            await database.set_user_glasses(UserSetItemSignature(USER, highball.id, 1))
+            await database.set_user_ingredients(UserSetItemSignature(USER, 1, 1), UserSetItemSignature(USER, 2, 1))
+
+        checked = asyncio.Event()
+        traded = asyncio.Event()
+
+        async def craft() -> None:
+            # Same order as craft confirm callback: check under user lock, then write with guarded updates.
+            async with database.lock_users(USER):
+                assert highball.id in await database.get_user_glasses(USER)
+                checked.set()
+                await traded.wait()
+
+                async with database:
+                    await database.take_user_items(ItemType.GLASS, USER, {highball.id: 1})
+                    await database.take_user_items(ItemType.INGREDIENT, USER, {1: 1, 2: 1})
+                    await database.add_user_drinks(UserSetItemSignature(USER, 10, 1))
+
+        async def trade() -> None:
+            await checked.wait()
+            async with database:
+                await database.move_user_items(ItemType.GLASS, USER, TARGET, {highball.id: 1})
+            traded.set()
+
+        results = await asyncio.gather(craft(), trade(), return_exceptions=True)
+
+        assert isinstance(results[0], NotEnoughItemsError) and results[1] is None, results
+        assert await total_glasses(database, highball) == {USER: 0, TARGET: 1}
+        assert 10 not in await database.get_user_drinks(USER)
+        assert {id: item.amount for id, item in (await database.get_user_ingredients(USER)).items()} == {1: 1, 2: 1}
+
+    run_with_database(test)
+
+
+def test_concurrent_crafts_and_trades_keep_item_count(run_with_database):
+    async def test(database: Database, glasses: tuple[Glass, Glass]) -> None:
+        highball, _ = glasses
+        stock = 50
+
+        async with database:
+            await database.create_user(USER, 'user')
+            await database.create_user(TARGET, 'target')
+            await database.set_user_glasses(UserSetItemSignature(USER, highball.id, stock))
+
+        async def craft() -> bool:
+            try:
+                async with database.lock_users(USER), database:
+                    await database.take_user_items(ItemType.GLASS, USER, {highball.id: 1})
+                    await database.add_user_drinks(UserSetItemSignature(USER, 10, 1))
+            except NotEnoughItemsError:
+                return False
+            return True
+
+        async def trade() -> bool:
+            try:
+                async with database:
+                    await database.move_user_items(ItemType.GLASS, USER, TARGET, {highball.id: 1})
+            except NotEnoughItemsError:
+                return False
+            return True
+
+        crafts = [craft() for _ in range(stock)]
+        trades = [trade() for _ in range(stock)]
+        results = await asyncio.gather(*(i for pair in zip(crafts, trades) for i in pair))
+
+        crafted = sum(results[::2])
+        traded = sum(results[1::2])
+        amounts = await total_glasses(database, highball)
+
+        assert crafted + traded == stock
+        assert amounts == {USER: 0, TARGET: traded}
+        assert (await database.get_user_drinks(USER))[10].amount == crafted
+
+    run_with_database(test)
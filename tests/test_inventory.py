@@ -0,0 +1,48 @@
+from database import Database
+from database.models import Glass, UserSetItemSignature
+from typedefs import ItemType
+
+USER = 1
+TARGET = 2
+
+
+def test_cached_inventory_keeps_database_order_after_writes(run_with_database):
+    async def test(database: Database, glasses: tuple[Glass, Glass]) -> None:
+        highball, cocktail = glasses
+
+        async with database:
+            # Case sensitive order would put `Lime` before `lemon`, names are compared with NOCASE in database.
+            await database.insert_ingredient(5, 'lemon', None, 'Fruit', False)
+            await database.insert_ingredient(6, 'orange', None, 'Fruit', False)
+            await database.create_user(USER, 'user')
+            await database.create_user(TARGET, 'target')
+            await database.set_user_ingredients(UserSetItemSignature(USER, 3, 2), UserSetItemSignature(USER, 2, 2))
+            await database.set_user_glasses(UserSetItemSignature(USER, highball.id, 1))
+
+        await database.get_user_inventory(USER)
+        await database.get_user_inventory(TARGET)
+        assert USER in database.inventory_cache and TARGET in database.inventory_cache
+
+        async with database:
+            await database.add_user_items(ItemType.INGREDIENT, UserSetItemSignature(USER, 5, 2))
+            await database.award_item(USER, ItemType.INGREDIENT, 6)
+            await database.award_item(USER, ItemType.INGREDIENT, 6)
+            await database.add_user_glasses(UserSetItemSignature(USER, cocktail.id, 1))
+            await database.move_user_items(ItemType.INGREDIENT, USER, TARGET, {3: 1, 2: 1})
+            await database.award_item(TARGET, ItemType.INGREDIENT, 5)
+
+        for user_id in (USER, TARGET):
+            cached = await database.get_user_inventory(user_id)
+            loaded = await database._load_user_inventory(user_id)
+
+            for type in ItemType:
+                index = list(ItemType).index(type)
+                assert list(cached[index].items()) == list(loaded[index].items()), (user_id, type)
+
+        # Pages fetched by key of last cached item continue cached order without repeating or skipping items.
+        ingredients = list((await database.get_user_ingredients(USER)).values())
+        last = ingredients[1]
+        page = await database.get_user_ingredients_page(USER, 10, (last.amount, last.name, last.id))
+        assert [i.id for i in ingredients[:2] + page] == [i.id for i in ingredients]
+
+    run_with_database(test)
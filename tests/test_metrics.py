@@ -0,0 +1,67 @@
+import asyncio
+import logging
+from types import SimpleNamespace
+from typing import Any
+
+from discord.ext import commands
+
+from metrics import metrics
+from utils import cog_logging_wrapper, send_followup
+
+HANDLER_SECONDS = 0.02
+SEND_SECONDS = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class FakeFollowup:
+    def __init__(self) -> None:
+        self.sent: list[str] = []
+
+    async def send(self, content: str, **kwargs: Any) -> None:
+        await asyncio.sleep(SEND_SECONDS)
+        self.sent.append(content)
+
+
+class FakeResponse:
+    async def defer(self) -> None:
+        pass
+
+
+def fake_interaction() -> Any:
+    return SimpleNamespace(
+        command=SimpleNamespace(qualified_name='test'),
+        user=SimpleNamespace(name='user', id=1),
+        response=FakeResponse(),
+        followup=FakeFollowup(),
+    )
+
+
+class Cog(commands.Cog):
+    @cog_logging_wrapper(logger=logger)
+    async def reply(self, interaction: Any) -> None:
+        await asyncio.sleep(HANDLER_SECONDS)
+        await send_followup(interaction, 'first')
+        await send_followup(interaction, 'second')
+
+
+def test_followups_sent_by_handler_are_timed_apart_from_it():
+    metrics.clear()
+    interaction = fake_interaction()
+
+    asyncio.run(Cog().reply(interaction))
+
+    assert interaction.followup.sent == ['first', 'second']
+    handler = metrics.commands[('test', 'handler')]
+    followup = metrics.commands[('test', 'followup')]
+    assert handler.count == followup.count == 1
+    assert 2 * SEND_SECONDS <= followup.sum < 3 * SEND_SECONDS
+    assert HANDLER_SECONDS <= handler.sum < SEND_SECONDS
+
+
+def test_send_followup_outside_command_is_not_recorded():
+    metrics.clear()
+
+    asyncio.run(send_followup(fake_interaction(), 'reply'))
+
+    assert not metrics.commands
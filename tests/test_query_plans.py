@@ -0,0 +1,113 @@
+import re
+
+from database import Database
+from database.init import DEFERRABLE_INDEXES
+from database.models import Glass, UserSetItemSignature
+from typedefs import ItemType
+
+SKIPPED_STATEMENTS = ('PRAGMA', 'BEGIN', 'COMMIT', 'ROLLBACK', 'CREATE', 'DROP', 'EXPLAIN')
+
+# Indexes added by migrations, each has to be used by at least one query of mixins.
+EXPECTED_INDEXES = (
+    'drink_inventory_user_amount',
+    'glass_inventory_user_amount',
+    'ingredient_inventory_user_amount',
+    'drink_ingredients_drink_ingredient',
+    *DEFERRABLE_INDEXES,
+)
+
+
+async def run_mixin_queries(database: Database, glasses: tuple[Glass, Glass]) -> None:
+    """Calls every mixin method that runs SQL, catalog ones go through in-memory catalog except loading it."""
+    highball, cocktail = glasses
+
+    async with database:
+        await database.create_user(1, 'user')
+        await database.create_user(2, 'target')
+        await database.set_user_ingredients(UserSetItemSignature(1, 1, 2), UserSetItemSignature(1, 2, 1))
+        await database.add_user_glasses(UserSetItemSignature(1, highball.id, 2))
+        await database.award_item(1, ItemType.DRINK, 10)
+        await database.move_user_items(ItemType.GLASS, 1, 2, {highball.id: 1})
+        await database.take_user_items(ItemType.INGREDIENT, 1, {1: 1})
+
+    database.inventory_cache.clear()
+    await database.get_user_inventory(1)
+
+    for type in ItemType:
+        await database.count_user_items(type, 1)
+    await database.get_user_drinks_page(1, 10)
+    await database.get_user_glasses_page(1, 10, offset=1)
+    await database.get_user_ingredients_page(1, 10, (1, 'Vodka', 1))
+
+    await database.search_drinks('gim', [1, 3], cocktail.id, limit=5, after=('Gimlet', 11))
+    await database.search_drinks(None, [4], None, limit=5)
+    await database.search_drinks('vodka', [], None, limit=5, offset=1)
+    await database.count_search_drinks('gim', [1], None)
+    await database.count_search_drinks(None, [], highball.id)
+
+    async with database:
+        await database.remove_drink_ingredient(10, 2)
+
+    database.catalog.invalidate()
+    await database.get_catalog()
+
+
+async def traced_queries(database: Database, glasses: tuple[Glass, Glass]) -> list[str]:
+    """Returns expanded SQL of statements executed by mixins on writer and reader connections."""
+    queries: list[str] = []
+    connections = (database.connection, *database.readers)
+
+    for connection in connections:
+        await connection.set_trace_callback(queries.append)
+    try:
+        await run_mixin_queries(database, glasses)
+    finally:
+        for connection in connections:
+            await connection.set_trace_callback(None)
+
+    return [' '.join(i.split()) for i in queries if i.split()[0].upper() not in SKIPPED_STATEMENTS]
+
+
+async def query_plan(database: Database, query: str) -> list[str]:
+    rows = await database._fetchrows(f'EXPLAIN QUERY PLAN {query}', connection=database.connection)
+    return [row[3] for row in rows]
+
+
+def full_scans(query: str, plan: list[str], tables: set[str]) -> list[str]:
+    """Returns tables that `plan` reads whole without index, table aliases of `query` are resolved."""
+    scanned: list[str] = []
+    for line in plan:
+        match = re.fullmatch(r'SCAN (\w+)', line)
+        if match is None:
+            continue
+
+        name = match[1]
+        alias = re.search(rf'\b(\w+) AS {name}\b', query)
+        table = alias[1] if alias else name
+        if table in tables:
+            scanned.append(table)
+
+    return scanned
+
+
+def test_mixin_queries_use_indexes(run_with_database):
+    async def test(database: Database, glasses: tuple[Glass, Glass]) -> None:
+        tables = set(await database._fetchcolumn("SELECT name FROM sqlite_master WHERE type = 'table';"))
+        queries = await traced_queries(database, glasses)
+        assert queries
+
+        used: set[str] = set()
+        failures: list[str] = []
+        for query in queries:
+            plan = await query_plan(database, query)
+            used.update(index for line in plan for index in re.findall(r'INDEX (\w+)', line))
+
+            # Only loads of whole catalog tables, without any filter, are expected to scan.
+            scanned = full_scans(query, plan, tables)
+            if scanned and ' WHERE ' in query:
+                failures.append(f'{query}\n  ' + '\n  '.join(plan))
+
+        assert not failures, 'Queries scan tables without index:\n' + '\n'.join(failures)
+        assert set(EXPECTED_INDEXES) <= used, f'Unused indexes: {set(EXPECTED_INDEXES) - used}'
+
+    run_with_database(test)
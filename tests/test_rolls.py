@@ -0,0 +1,48 @@
+import random
+from collections import Counter
+
+from cogs.rolls import ROLL_WEIGHTS, get_random_type
+from database.models import Drink, Glass, Ingredient
+from embeds import drink_embed, embed_cache, glass_embed, ingredient_embed
+
+ROLLS = 20000
+# Chi-squared critical value for 2 degrees of freedom at p = 0.001, so test fails by chance once in 1000 seeds.
+CHI_SQUARED_LIMIT = 13.82
+
+GLASS = Glass(1, 'Highball glass')
+DRINK = Drink(10, 'Screwdriver', None, 'IBA', 'Cocktail', True, GLASS.id, 'Mix.', 'http://a')
+INGREDIENT = Ingredient(1, 'Vodka', 'Clear spirit', 'Vodka', True)
+
+
+def render_embeds() -> None:
+    # Cache is cleared, so emojis and colors seeded by item name are picked again.
+    embed_cache.clear()
+    drink_embed(DRINK, GLASS, [])
+    glass_embed(GLASS)
+    ingredient_embed(INGREDIENT)
+
+
+def test_embed_rendering_keeps_global_random_state():
+    random.seed(1)
+    state = random.getstate()
+
+    render_embeds()
+
+    assert random.getstate() == state
+
+
+def test_roll_types_follow_weights_after_embed_rendering():
+    random.seed(2)
+
+    counts: Counter[str] = Counter()
+    for _ in range(ROLLS):
+        render_embeds()
+        counts[get_random_type()] += 1
+
+    total_weight = sum(ROLL_WEIGHTS.values())
+    chi_squared = sum(
+        (counts[type] - ROLLS * weight / total_weight) ** 2 / (ROLLS * weight / total_weight)
+        for type, weight in ROLL_WEIGHTS.items()
+    )
+
+    assert chi_squared < CHI_SQUARED_LIMIT, counts